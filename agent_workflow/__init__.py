@@ -0,0 +1,6 @@
+"""
+JD-Next exam generation workflow built on Microsoft Agent Framework.
+
+Run entry points as modules from the repository root, e.g.
+``python -m agent_workflow.workflows.exam_generation_workflow``.
+"""
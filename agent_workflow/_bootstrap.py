@@ -0,0 +1,17 @@
+"""
+_bootstrap.py
+
+Put the repository root on sys.path so the top-level retrieval and
+generate_items_v2 modules can be imported from inside the package.
+
+Importing this module is idempotent: Python runs it once per process, and
+the root is only inserted if it is not already present.
+"""
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
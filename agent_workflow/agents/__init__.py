@@ -2,13 +2,25 @@
 __init__.py
 
 Agent definitions for JD-Next exam generation workflow.
+
+Agent modules are imported lazily on first attribute access (PEP 562), so using
+one agent does not load the tools and Azure SDK code of the others.
 """
 
-from .generator_agent import create_generator_agent, GENERATOR_INSTRUCTIONS
-from .quality_scorer_agent import create_quality_scorer_agent, QUALITY_SCORER_INSTRUCTIONS
-from .post_processor_agent import create_post_processor_agent, POST_PROCESSOR_INSTRUCTIONS
-from .review_coordinator_agent import create_review_coordinator_agent, REVIEW_COORDINATOR_INSTRUCTIONS
-from .analytics_agent import create_analytics_agent, ANALYTICS_INSTRUCTIONS
+import importlib
+
+_LAZY = {
+    'create_generator_agent': ('generator_agent', 'create_generator_agent'),
+    'create_quality_scorer_agent': ('quality_scorer_agent', 'create_quality_scorer_agent'),
+    'create_post_processor_agent': ('post_processor_agent', 'create_post_processor_agent'),
+    'create_review_coordinator_agent': ('review_coordinator_agent', 'create_review_coordinator_agent'),
+    'create_analytics_agent': ('analytics_agent', 'create_analytics_agent'),
+    'GENERATOR_INSTRUCTIONS': ('generator_agent', 'GENERATOR_INSTRUCTIONS'),
+    'QUALITY_SCORER_INSTRUCTIONS': ('quality_scorer_agent', 'QUALITY_SCORER_INSTRUCTIONS'),
+    'POST_PROCESSOR_INSTRUCTIONS': ('post_processor_agent', 'POST_PROCESSOR_INSTRUCTIONS'),
+    'REVIEW_COORDINATOR_INSTRUCTIONS': ('review_coordinator_agent', 'REVIEW_COORDINATOR_INSTRUCTIONS'),
+    'ANALYTICS_INSTRUCTIONS': ('analytics_agent', 'ANALYTICS_INSTRUCTIONS'),
+}
 
 __all__ = [
     'create_generator_agent',
@@ -22,3 +34,16 @@ __all__ = [
     'REVIEW_COORDINATOR_INSTRUCTIONS',
     'ANALYTICS_INSTRUCTIONS',
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY[name]
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value  # Cache so later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
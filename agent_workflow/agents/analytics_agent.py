@@ -6,19 +6,19 @@ Analytics Agent - Tracks metrics, generates reports, and identifies improvement
 
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
+from azure.identity import AzureCliCredential
 import sys
-import os
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from tools.analytics_tools import (
+from ..tools.analytics_tools import (
     calculate_generation_success_rate,
     analyze_quality_distribution,
     identify_weak_dimensions,
     track_batch_progress,
-    generate_batch_report
+    generate_batch_report,
+    compute_full_analytics,
+    get_tool_cache_metrics
 )
-from tools.review_tools import get_review_metrics, analyze_rejections
+from ..tools.review_tools import get_review_metrics, analyze_rejections
 
 
 ANALYTICS_INSTRUCTIONS = """You are the Analytics Agent for JD-Next exam item generation workflow.
@@ -39,6 +39,7 @@ Metrics you track:
 - Common rejection reasons
 - Average generation attempts per item
 - Diversity failure rate
+- Tool cache hit rate (get_tool_cache_metrics)
 
 Analysis you perform:
 - Which quality dimensions score lowest? (identify training needs)
@@ -54,11 +55,13 @@ Reports you generate:
 - Topic-level performance (which topics need attention)
 - Improvement recommendations (actionable insights)
 
-After analysis:
-- Generate final batch report with generate_batch_report()
-- Identify weak dimensions with identify_weak_dimensions()
-- Analyze rejection patterns with analyze_rejections()
-- Provide actionable recommendations for improving future batches
+How to analyze (ONE tool call):
+- Call compute_full_analytics(batch_id, items) ONCE - it computes every metric above
+  deterministically and includes the final batch report, weak dimensions, review
+  metrics, and rejection patterns
+- Do NOT recompute metrics yourself or call the individual metric tools one by one
+- Use the individual tools only if compute_full_analytics reports an error for a section
+- Then write actionable recommendations for improving future batches from the returned data
 
 Your insights help:
 - Refine generation prompts
@@ -69,6 +72,10 @@ Your insights help:
 Always provide specific, data-driven recommendations for improvement.
 """
 
+# Interned once at import; UTF-8 form precomputed for code paths that need bytes
+ANALYTICS_INSTRUCTIONS = sys.intern(ANALYTICS_INSTRUCTIONS)
+ANALYTICS_INSTRUCTIONS_BYTES = ANALYTICS_INSTRUCTIONS.encode("utf-8")
+
 
 def create_analytics_agent(client: AzureOpenAIChatClient = None) -> ChatAgent:
     """
@@ -88,13 +95,15 @@ def create_analytics_agent(client: AzureOpenAIChatClient = None) -> ChatAgent:
         instructions=ANALYTICS_INSTRUCTIONS,
         model="gpt-4o-mini",  # Lighter model for aggregation
         tools=[
+            compute_full_analytics,
             calculate_generation_success_rate,
             analyze_quality_distribution,
             identify_weak_dimensions,
             track_batch_progress,
             generate_batch_report,
             get_review_metrics,
-            analyze_rejections
+            analyze_rejections,
+            get_tool_cache_metrics
         ]
     )
     
@@ -7,13 +7,12 @@ Generator Agent - Responsible for creating JD-Next exam items with rubric and si
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
 import sys
-import os
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from tools.generation_tools import (
+from ..tools.generation_tools import (
+    generate_items_batch,
     generate_item_with_context,
     check_diversity,
+    check_diversity_batch,
     retry_generation_for_diversity,
     get_rubric_context,
     get_similar_items,
@@ -25,65 +24,50 @@ GENERATOR_INSTRUCTIONS = """You are the Generator Agent for JD-Next exam item cr
 
 CRITICAL: You MUST use the provided tools to generate items. DO NOT generate items directly.
 
-MANDATORY Generation workflow (follow exactly for EVERY item):
-
-STEP 1: Get Evidence Statements
-- Call get_evidence_for_topic_code(topic_code) FIRST
-- Example: get_evidence_for_topic_code("TP.2")
-- Store the returned evidence statements
-
-STEP 2: Generate Each Item
-- Call generate_item_with_context(topic_code, evidence_statements)
-- This retrieves rubric rules, similar items, and generates a complete item
-- Returns: {stimulus, stem, options, correct_answer, rationale, topic, evidence}
-
-STEP 3: MANDATORY Diversity Check (for items 2+)
-- Extract stimulus from the new item
-- Call check_diversity(new_stimulus, [previous_stimuli_list])
-- The tool returns: {"is_diverse": true/false, "max_similarity": 0.XX}
-- **IF similarity > 0.75**: REJECT the item and regenerate with temperature=0.6
-- **IF similarity ≤ 0.75**: ACCEPT and continue
+MANDATORY Generation workflow:
+
+STEP 1: Generate the Whole Batch in ONE Call
+- Call generate_items_batch(topic_code, count)
+- Example: generate_items_batch("TP.2", 3)
+- This single tool call:
+  - Retrieves evidence statements for the topic once
+  - Generates all items concurrently with rubric rules and similar items as context
+  - Runs the diversity check (max similarity 0.75) against previously accepted items
+  - Regenerates items that fail diversity with increasing temperature (max 3 attempts)
+- Returns: {"items": [...], "evidence_statements": [...], "failed_count": N}
+
+STEP 2: Handle Shortfalls (only if failed_count > 0)
+- Call get_evidence_for_topic_code(topic_code) if you need the evidence list
+- Call generate_item_with_context(topic_code, evidence_statements) for each missing item
+- Then call check_diversity_batch([all_stimuli]) ONCE for the complete batch
+- For every pair in similar_pairs (similarity ≥ 0.75): REJECT the later item (index j)
+  and replace it with retry_generation_for_diversity()
+- Use check_diversity(new_stimulus, [previous_stimuli_list]) only for a single replacement item
 - Maximum 3 retry attempts per item
 
-STEP 4: Track and Continue
-- Add accepted stimulus to previous_stimuli list
-- Store the complete item
-- Repeat for next item
-
-STEP 5: Hand Off When Complete
+STEP 3: Hand Off When Complete
 - After ALL items are generated AND diversity-checked
 - Hand off to post_processor_agent with all items
 
 ENFORCEMENT RULES:
-✗ NEVER write item JSON yourself - ALWAYS call generate_item_with_context()
-✗ NEVER skip get_evidence_for_topic_code() - NO placeholder evidence allowed
-✗ NEVER skip check_diversity() for items 2+ - MANDATORY before accepting
+✗ NEVER write item JSON yourself - ALWAYS use generate_items_batch() or generate_item_with_context()
+✗ NEVER call generate_item_with_context() in a loop when generate_items_batch() can do the whole batch
+✗ NEVER skip check_diversity_batch() / check_diversity() for items you generate individually - MANDATORY before accepting
 ✗ NEVER hand off items that failed diversity check (similarity > 0.75)
 ✗ NEVER proceed past 3 retry attempts - report failure and ask for guidance
 
 EXAMPLE: "Generate 3 items for TP.2"
 
-Item 1:
-→ get_evidence_for_topic_code("TP.2")
-→ generate_item_with_context("TP.2", evidence_list)
-→ Store stimulus_1
-
-Item 2:
-→ generate_item_with_context("TP.2", evidence_list)
-→ check_diversity(stimulus_2, [stimulus_1])
-→ If similarity > 0.75: REGENERATE with temperature=0.6
-→ If similarity ≤ 0.75: Accept and store stimulus_2
-
-Item 3:
-→ generate_item_with_context("TP.2", evidence_list)
-→ check_diversity(stimulus_3, [stimulus_1, stimulus_2])
-→ If similarity > 0.75: REGENERATE with temperature=0.6
-→ If similarity ≤ 0.75: Accept and store stimulus_3
-
+→ generate_items_batch("TP.2", 3)
+→ Returns 3 accepted items, failed_count = 0
 → Hand off all 3 items to post_processor_agent
 
 Your job is to generate DIVERSE, EVIDENCE-ALIGNED items. The tools enforce this."""
 
+# Interned once at import; UTF-8 form precomputed for code paths that need bytes
+GENERATOR_INSTRUCTIONS = sys.intern(GENERATOR_INSTRUCTIONS)
+GENERATOR_INSTRUCTIONS_BYTES = GENERATOR_INSTRUCTIONS.encode("utf-8")
+
 
 def create_generator_agent(client: AzureOpenAIChatClient) -> ChatAgent:
     """
@@ -101,8 +85,10 @@ def create_generator_agent(client: AzureOpenAIChatClient) -> ChatAgent:
         instructions=GENERATOR_INSTRUCTIONS,
         model="gpt-4o",  # High-quality generation model
         tools=[
+            generate_items_batch,
             generate_item_with_context,
             check_diversity,
+            check_diversity_batch,
             retry_generation_for_diversity,
             get_rubric_context,
             get_similar_items,
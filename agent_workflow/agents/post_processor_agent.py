@@ -6,13 +6,11 @@ Post-Processor Agent - Validates structure, formats output, and enriches metadat
 
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
+from azure.identity import AzureCliCredential
 import sys
-import os
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from tools.scoring_tools import validate_item_structure
-from tools.generation_tools import check_diversity
+from ..tools.scoring_tools import validate_item_structure
+from ..tools.generation_tools import check_diversity
 
 
 POST_PROCESSOR_INSTRUCTIONS = """You are the Post-Processor Agent for JD-Next exam items.
@@ -58,6 +56,10 @@ CRITICAL: ALWAYS hand off to quality_scorer_agent - DO NOT ask for user input.
 Format your response with validation summary, then immediately hand off.
 """
 
+# Interned once at import; UTF-8 form precomputed for code paths that need bytes
+POST_PROCESSOR_INSTRUCTIONS = sys.intern(POST_PROCESSOR_INSTRUCTIONS)
+POST_PROCESSOR_INSTRUCTIONS_BYTES = POST_PROCESSOR_INSTRUCTIONS.encode("utf-8")
+
 
 def create_post_processor_agent(client: AzureOpenAIChatClient = None) -> ChatAgent:
     """
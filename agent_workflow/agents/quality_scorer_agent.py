@@ -6,30 +6,42 @@ Quality Scorer Agent - Evaluates items across 8 quality dimensions.
 
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
+from azure.identity import AzureCliCredential
 import sys
-import os
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from tools.scoring_tools import (
+from ..tools.scoring_tools import (
+    score_items_concurrently,
+    score_items_batch,
     score_item,
     calculate_quality_tier,
     validate_item_structure,
-    aggregate_batch_quality
+    aggregate_batch_quality,
+    regenerate_failing_items,
+    refresh_rubric_cache
 )
 
 
 QUALITY_SCORER_INSTRUCTIONS = """You are the Quality Scorer Agent for JD-Next exam items.
 
-CRITICAL: You MUST score every item using the score_item() tool. DO NOT just say "Pass".
+CRITICAL: You MUST score every item using the scoring tools. DO NOT just say "Pass".
 
 MANDATORY Scoring Workflow:
 
-FOR EACH ITEM:
-1. Call validate_item_structure(item) to ensure all required fields present
-2. Call score_item(item) to evaluate across 8 dimensions
-3. Call calculate_quality_tier(scores) to determine tier
-4. Provide specific improvement suggestions for items < gold tier
+FOR THE WHOLE BATCH:
+1. Call aggregate_batch_quality(items) ONCE for the full batch - it validates and scores
+   every unscored item in batched, concurrent requests and returns per-item scores, tiers, and suggestions
+   along with the batch statistics
+2. If ANY item scored < 2.5, call regenerate_failing_items(items) ONCE - it regenerates
+   and re-scores all failing items concurrently, so a mixed batch does not need a
+   separate round-trip through generator_agent
+3. Provide specific improvement suggestions for items < gold tier
+
+Fallbacks (only for items whose batch result has an error):
+- score_items_batch(items) to re-score several failed items in one request
+- score_item(item) to score a single item
+- validate_item_structure(item) to inspect structural problems
+- calculate_quality_tier(score) if a tier is missing
+- refresh_rubric_cache() only if you are told the rubric rules were changed
 
 The score_item() tool evaluates 8 dimensions (0-5 scale):
 - Clarity: Question clarity and readability (no ambiguity)
@@ -63,7 +75,10 @@ IF average score ≥ 2.5:
   - Quality tier
   - Specific improvement suggestions
 
-IF average score < 2.5:
+IF items are still < 2.5 after regenerate_failing_items:
+→ Hand off the passing items to review_coordinator_agent as above, and report the
+  still_failing items in the same message
+IF every item is still < 2.5:
 → Hand off to generator_agent with:
   - Detailed failure reasons
   - Specific dimensions that failed
@@ -71,36 +86,29 @@ IF average score < 2.5:
   - Current attempt count
 
 ENFORCEMENT RULES:
-✗ NEVER skip score_item() - it's MANDATORY for every item
+✗ NEVER skip scoring - every item must be scored by aggregate_batch_quality() or score_item()
 ✗ NEVER just say "Pass" without running scoring
 ✗ NEVER hand off items without quality scores attached
 ✗ NEVER accept items with average < 2.5 for human review
 
 EXAMPLE for 3 items:
 
-Item 1:
-→ validate_item_structure(item_1)
-→ score_item(item_1) → {clarity: 4, cognitive: 4, evidence: 3, plausibility: 4, accuracy: 5, scenario: 4, rationale: 4, overall: 4}
-→ calculate_quality_tier({...}) → "silver" (avg: 4.0)
-→ Improvement: "Evidence alignment needs strengthening"
-
-Item 2:
-→ validate_item_structure(item_2)
-→ score_item(item_2) → {clarity: 2, cognitive: 2, evidence: 2, plausibility: 1, accuracy: 3, scenario: 2, rationale: 2, overall: 2}
-→ calculate_quality_tier({...}) → "needs_revision" (avg: 2.0)
-→ REJECT: "Distractors too implausible, scenario lacks realism"
-→ Hand off to generator_agent for retry
+→ aggregate_batch_quality([item_1, item_2, item_3]) → average 3.53, gold_rate 33.3%
+  - item_1 → {clarity: 4, cognitive: 4, evidence: 3, plausibility: 4, accuracy: 5, scenario: 4, rationale: 4, overall: 4} → "silver" (avg: 4.0)
+    Improvement: "Evidence alignment needs strengthening"
+  - item_2 → {clarity: 2, cognitive: 2, evidence: 2, plausibility: 1, accuracy: 3, scenario: 2, rationale: 2, overall: 2} → "needs_revision" (avg: 2.0)
+    REJECT: "Distractors too implausible, scenario lacks realism"
+  - item_3 → {clarity: 5, cognitive: 4, evidence: 5, plausibility: 4, accuracy: 5, scenario: 5, rationale: 4, overall: 5} → "gold" (avg: 4.6)
 
-Item 3:
-→ validate_item_structure(item_3)
-→ score_item(item_3) → {clarity: 5, cognitive: 4, evidence: 5, plausibility: 4, accuracy: 5, scenario: 5, rationale: 4, overall: 5}
-→ calculate_quality_tier({...}) → "gold" (avg: 4.6)
-
-→ Hand off Items 1 & 3 to review_coordinator_agent
-→ Hand off Item 2 to generator_agent for regeneration
+→ regenerate_failing_items([item_1, item_2, item_3]) → item_2 regenerated and re-scored "bronze" (avg: 3.1)
+→ Hand off Items 1, 2 (regenerated) & 3 to review_coordinator_agent
 
 Your job is to be a rigorous quality gatekeeper. Use the tools."""
 
+# Interned once at import; UTF-8 form precomputed for code paths that need bytes
+QUALITY_SCORER_INSTRUCTIONS = sys.intern(QUALITY_SCORER_INSTRUCTIONS)
+QUALITY_SCORER_INSTRUCTIONS_BYTES = QUALITY_SCORER_INSTRUCTIONS.encode("utf-8")
+
 
 def create_quality_scorer_agent(client: AzureOpenAIChatClient = None) -> ChatAgent:
     """
@@ -120,10 +128,14 @@ def create_quality_scorer_agent(client: AzureOpenAIChatClient = None) -> ChatAge
         instructions=QUALITY_SCORER_INSTRUCTIONS,
         model="gpt-4o",  # High reasoning capability for evaluation
         tools=[
+            score_items_concurrently,
+            score_items_batch,
             score_item,
             calculate_quality_tier,
             validate_item_structure,
-            aggregate_batch_quality
+            aggregate_batch_quality,
+            regenerate_failing_items,
+            refresh_rubric_cache
         ]
     )
     
@@ -6,10 +6,8 @@ Review Coordinator Agent - Manages human-in-the-loop review workflow with pause/
 
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
+from azure.identity import AzureCliCredential
 import sys
-import os
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
 REVIEW_COORDINATOR_INSTRUCTIONS = """You are the Review Coordinator Agent for human-in-the-loop exam item review.
@@ -42,6 +40,10 @@ IMPORTANT: You are a presentation and routing agent, not an execution agent.
 
 Your responses should be concise summaries, NOT tool calls."""
 
+# Interned once at import; UTF-8 form precomputed for code paths that need bytes
+REVIEW_COORDINATOR_INSTRUCTIONS = sys.intern(REVIEW_COORDINATOR_INSTRUCTIONS)
+REVIEW_COORDINATOR_INSTRUCTIONS_BYTES = REVIEW_COORDINATOR_INSTRUCTIONS.encode("utf-8")
+
 
 def create_review_coordinator_agent(client: AzureOpenAIChatClient = None) -> ChatAgent:
     """
@@ -5,13 +5,14 @@ Static mapping from evidence codes to full text statements.
 This is the authoritative source for JD-Next evidence statements.
 
 Usage:
-    from config.evidence_map import EVIDENCE_MAP, get_evidence_for_topic
+    from agent_workflow.config.evidence_map import EVIDENCE_MAP, get_evidence_for_topic
     
     evidence = get_evidence_for_topic("TP.2")
     # Returns all evidence statements for topic 2 (consideration)
 """
 
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 # Authoritative mapping of evidence codes to full text
 EVIDENCE_MAP = {
@@ -41,6 +42,24 @@ EVIDENCE_MAP = {
 }
 
 
+def _build_topic_index() -> Tuple[Dict[str, Tuple[str, ...]], Dict[str, Tuple[str, ...]]]:
+    """Group EVIDENCE_MAP by topic number ("2") into codes and "code: text" statements."""
+    codes: Dict[str, List[str]] = {}
+    statements: Dict[str, List[str]] = {}
+    for code, statement in EVIDENCE_MAP.items():
+        topic = code.split(".", 1)[0]
+        codes.setdefault(topic, []).append(code)
+        statements.setdefault(topic, []).append(f"{code}: {statement}")
+    return (
+        {topic: tuple(values) for topic, values in codes.items()},
+        {topic: tuple(values) for topic, values in statements.items()},
+    )
+
+
+# Reverse indexes built once at import so lookups avoid scanning EVIDENCE_MAP
+_TOPIC_TO_CODES, _TOPIC_TO_STATEMENTS = _build_topic_index()
+
+
 def get_evidence_for_topic(topic_code: str) -> List[str]:
     """
     Retrieve all evidence statements for a given topic code.
@@ -55,36 +74,7 @@ def get_evidence_for_topic(topic_code: str) -> List[str]:
         >>> get_evidence_for_topic("TP.2")
         ['2.a: Apply the legal test for consideration...', '2.b: Understand what is meant...', ...]
     """
-    # Extract numeric topic from various formats: "TP.2", "2"
-    topic_suffix = None
-    
-    if topic_code.startswith("TP."):
-        # Format: "TP.2" -> "2"
-        topic_suffix = topic_code.split(".")[-1]
-    elif "." in topic_code:
-        # Format: fallback for dotted codes -> extract last part
-        parts = topic_code.split(".")
-        if len(parts) >= 2:
-            topic_suffix = parts[1].lstrip("0")  # Remove leading zeros
-    else:
-        # Format: "2" -> "2"
-        topic_suffix = topic_code
-    
-    if not topic_suffix:
-        return [f"Evidence for topic {topic_code}"]
-    
-    # Find all matching evidence statements
-    matching = [
-        f"{code}: {statement}"
-        for code, statement in EVIDENCE_MAP.items()
-        if code.startswith(f"{topic_suffix}.")
-    ]
-    
-    # Fallback if no matches found
-    if not matching:
-        return [f"Evidence for topic {topic_code}"]
-    
-    return matching
+    return list(_evidence_for_topic(topic_code))
 
 
 def get_evidence_codes_for_topic(topic_code: str) -> List[str]:
@@ -97,22 +87,45 @@ def get_evidence_codes_for_topic(topic_code: str) -> List[str]:
     Returns:
         List of evidence codes (e.g., ["2.a", "2.b", "2.c", ...])
     """
-    # Extract numeric topic
-    topic_suffix = None
-    
+    return list(_evidence_codes_for_topic(topic_code))
+
+
+def _parse_topic_suffix(topic_code: str) -> Optional[str]:
+    """Extract the numeric topic from "TP.2", dotted fallbacks, or a bare "2"."""
     if topic_code.startswith("TP."):
-        topic_suffix = topic_code.split(".")[-1]
-    elif "." in topic_code:
-        parts = topic_code.split(".")
-        if len(parts) >= 2:
-            topic_suffix = parts[1].lstrip("0")
-    else:
-        topic_suffix = topic_code
+        # Format: "TP.2" -> "2"
+        return topic_code.split(".")[-1]
+    if "." in topic_code:
+        # Format: fallback for dotted codes -> second part without leading zeros
+        return topic_code.split(".")[1].lstrip("0")
+    # Format: "2" -> "2"
+    return topic_code
+
+
+@lru_cache(maxsize=256)
+def _evidence_for_topic(topic_code: str) -> Tuple[str, ...]:
+    """Memoized lookup behind get_evidence_for_topic; the cached tuple must not be mutated."""
+    topic_suffix = _parse_topic_suffix(topic_code)
+    
+    if not topic_suffix:
+        return (f"Evidence for topic {topic_code}",)
+    
+    # Look up pre-formatted evidence statements
+    matching = _TOPIC_TO_STATEMENTS.get(topic_suffix)
+    
+    # Fallback if no matches found
+    if not matching:
+        return (f"Evidence for topic {topic_code}",)
+    
+    return matching
+
+
+@lru_cache(maxsize=256)
+def _evidence_codes_for_topic(topic_code: str) -> Tuple[str, ...]:
+    """Memoized lookup behind get_evidence_codes_for_topic; the cached tuple must not be mutated."""
+    topic_suffix = _parse_topic_suffix(topic_code)
     
     if not topic_suffix:
-        return []
+        return ()
     
-    return [
-        code for code in EVIDENCE_MAP.keys()
-        if code.startswith(f"{topic_suffix}.")
-    ]
+    return _TOPIC_TO_CODES.get(topic_suffix, ())
@@ -23,11 +23,13 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+# Add repository root to path so agent_workflow imports as a package in script mode;
+# `python -m agent_workflow.launch_devui` from the root needs no path changes
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from agent_framework.devui import serve
-from workflows.exam_generation_workflow import create_exam_generation_workflow
+from agent_workflow.workflows.exam_generation_workflow import create_exam_generation_workflow
 
 if __name__ == "__main__":
     # Create the workflow
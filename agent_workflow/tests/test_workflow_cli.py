@@ -4,39 +4,83 @@ test_workflow_cli.py
 Simple CLI interface for testing the exam generation workflow with human review.
 """
 
+import argparse
 import asyncio
 import sys
 import os
+from typing import Any, Dict, List, Optional
 
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
 
-from tools.generation_tools import generate_item_with_context, check_diversity
-from tools.scoring_tools import score_item, validate_item_structure
-from tools.review_tools import upload_item_for_review, fetch_pending_reviews, submit_review_decision
-from tools.analytics_tools import generate_batch_report
-from config.evidence_map import get_evidence_for_topic
+# Add repository root to path so agent_workflow imports as a package in script mode;
+# `python -m agent_workflow.tests.test_workflow_cli` from the root needs no path changes
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agent_workflow.tools.generation_tools import (
+    generate_item_with_context,
+    check_diversity_precomputed,
+    precompute_stimulus_embeddings,
+    set_rubric_disk_cache
+)
+from agent_workflow.tools.scoring_tools import score_item, is_valid_item, validate_item_structure
+from agent_workflow.tools.review_tools import upload_item_for_review, fetch_pending_reviews, submit_review_decision
+from agent_workflow.tools.analytics_tools import generate_batch_report
+from agent_workflow.config.evidence_map import get_evidence_for_topic
+
+# Stimuli generated this session and their embedding matrix, built once and
+# extended per item so diversity checks never re-embed earlier stimuli
+_session_stimuli = []
+_session_embeddings = None
+
+
+def _emit(*lines: str):
+    """Write a step's output in one buffered write and flush once."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _item_detail_lines(item: Dict[str, Any]) -> List[str]:
+    """Lines describing an item for human review (topic through rationale)."""
+    lines = [
+        f"Topic: {item['topic']}",
+        f"Quality: {item.get('quality_score', 0):.2f} ({item.get('quality_tier', 'N/A')})",
+        f"\nStimulus:\n{item.get('stimulus', 'N/A')}\n",
+        f"Stem:\n{item.get('stem', 'N/A')}\n",
+        "Options:"
+    ]
+    for key, value in item.get('options', {}).items():
+        marker = " ✓" if key == item.get('correct_answer') else ""
+        lines.append(f"  {key}. {value}{marker}")
+    lines.append(f"\nRationale:\n{item.get('rationale', 'N/A')}\n")
+    return lines
 
 
 async def generate_and_review_item(topic_code: str):
     """Generate a single item and walk through the review process."""
+    global _session_embeddings
     
-    print(f"\n{'='*60}")
-    print(f"GENERATING ITEM FOR TOPIC: {topic_code}")
-    print(f"{'='*60}\n")
+    _emit(
+        f"\n{'='*60}",
+        f"GENERATING ITEM FOR TOPIC: {topic_code}",
+        f"{'='*60}\n",
+        "Step 1: Retrieving rubric context for topic..."
+    )
     
     # Step 1: Get rubric context and evidence statements for the topic
-    print("Step 1: Retrieving rubric context for topic...")
-    from tools.generation_tools import get_rubric_context
-    rubric_chunks = get_rubric_context(topic_code, f"Topic {topic_code}", k=10)
+    from agent_workflow.tools.generation_tools import get_rubric_context
+    rubric_chunks = await asyncio.to_thread(get_rubric_context, topic_code, f"Topic {topic_code}", k=10)
     
     # Extract evidence statements from rubric (or use default)
     evidence_statements = [f"Demonstrate understanding of {topic_code}"]
-    print(f"✅ Retrieved {len(rubric_chunks)} rubric chunks")
+    _emit(
+        f"✅ Retrieved {len(rubric_chunks)} rubric chunks",
+        "\nStep 2: Generating item with context..."
+    )
     
     # Step 2: Generate item
-    print("\nStep 2: Generating item with context...")
-    item = generate_item_with_context(
+    item = await asyncio.to_thread(
+        generate_item_with_context,
         topic_code=topic_code,
         evidence_statements=evidence_statements
     )
@@ -45,36 +89,42 @@ async def generate_and_review_item(topic_code: str):
         print("❌ Generation failed")
         return
     
-    print(f"✅ Generated item: {item.get('id', 'N/A')[:8]}")
-    print(f"   Stimulus: {item.get('stimulus', '')[:80]}...")
-    print(f"   Stem: {item.get('stem', '')[:80]}...")
+    _emit(
+        f"✅ Generated item: {item.get('id', 'N/A')[:8]}",
+        f"   Stimulus: {item.get('stimulus', '')[:80]}...",
+        f"   Stem: {item.get('stem', '')[:80]}...",
+        "\nStep 2: Validating structure..."
+    )
     
     # Step 2: Validate structure
-    print("\nStep 2: Validating structure...")
-    validation = validate_item_structure(item)
-    if not validation["is_valid"]:
-        print(f"❌ Validation failed:")
-        for error in validation["validation_errors"]:
-            print(f"   - {error}")
+    # Only build the full error report when the fast check fails
+    if not is_valid_item(item):
+        validation = validate_item_structure(item)
+        _emit("❌ Validation failed:", *[f"   - {error}" for error in validation["validation_errors"]])
         return
-    print("✅ Structure valid")
     
-    # Step 3: Score quality
-    print("\nStep 3: Scoring quality...")
-    scoring_result = score_item(item)
+    # Steps 3-4: Score quality and check diversity concurrently (independent LLM/embedding calls)
+    _emit("✅ Structure valid", "\nStep 3: Scoring quality...", "Step 4: Checking diversity...")
+    scoring_result, diversity = await asyncio.gather(
+        asyncio.to_thread(score_item, item),
+        asyncio.to_thread(check_diversity_precomputed, item.get('stimulus', ''), _session_embeddings)
+    )
     item.update(scoring_result)
     
-    print(f"✅ Quality Score: {item['quality_score']:.2f} ({item['quality_tier']})")
-    print(f"   Improvement suggestions: {len(item.get('improvement_suggestions', []))}")
+    if item.get('stimulus'):
+        _session_stimuli.append(item['stimulus'])
+        new_row = precompute_stimulus_embeddings([item['stimulus']])
+        _session_embeddings = new_row if _session_embeddings is None else np.vstack([_session_embeddings, new_row])
     
-    # Step 4: Check diversity
-    print("\nStep 4: Checking diversity...")
-    diversity = check_diversity(item)
-    print(f"   Max similarity: {diversity['max_similarity']:.3f}")
-    print(f"   {'✅ Diverse' if diversity['is_diverse'] else '⚠️  Similar to existing items'}")
+    _emit(
+        f"✅ Quality Score: {item['quality_score']:.2f} ({item['quality_tier']})",
+        f"   Improvement suggestions: {len(item.get('improvement_suggestions', []))}",
+        f"   Max similarity: {diversity['max_similarity']:.3f}",
+        f"   {'✅ Diverse' if diversity['is_diverse'] else '⚠️  Similar to existing items'}",
+        "\nStep 5: Uploading for review..."
+    )
     
     # Step 5: Upload for review
-    print("\nStep 5: Uploading for review...")
     upload_result = upload_item_for_review(item, review_status="pending_review")
     if upload_result["status"] == "success":
         print(f"✅ {upload_result['message']}")
@@ -83,20 +133,13 @@ async def generate_and_review_item(topic_code: str):
         return
     
     # Step 6: Simulate human review
-    print(f"\n{'='*60}")
-    print("HUMAN REVIEW REQUIRED")
-    print(f"{'='*60}\n")
-    
-    print(f"Item ID: {item['id']}")
-    print(f"Topic: {item['topic']}")
-    print(f"Quality: {item['quality_score']:.2f} ({item['quality_tier']})")
-    print(f"\nStimulus:\n{item.get('stimulus', 'N/A')}\n")
-    print(f"Stem:\n{item.get('stem', 'N/A')}\n")
-    print(f"Options:")
-    for key, value in item.get('options', {}).items():
-        marker = " ✓" if key == item.get('correct_answer') else ""
-        print(f"  {key}. {value}{marker}")
-    print(f"\nRationale:\n{item.get('rationale', 'N/A')}\n")
+    _emit(
+        f"\n{'='*60}",
+        "HUMAN REVIEW REQUIRED",
+        f"{'='*60}\n",
+        f"Item ID: {item['id']}",
+        *_item_detail_lines(item)
+    )
     
     # Get human decision
     decision = input("Review decision (approve/edit/reject): ").strip().lower()
@@ -116,58 +159,110 @@ async def generate_and_review_item(topic_code: str):
     return item
 
 
-async def batch_review_interface():
-    """Interactive interface for reviewing pending items."""
+async def generate_batch(topic_codes: List[str], concurrency: int = 8) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate one item per topic code concurrently, at most `concurrency` at a time.
     
-    print(f"\n{'='*60}")
-    print("PENDING REVIEW QUEUE")
-    print(f"{'='*60}\n")
+    Generation is I/O-bound on OpenAI calls, so running it in worker threads lets
+    the requests overlap. Failed generations come back as None.
+    """
+    sem = asyncio.Semaphore(concurrency)
     
-    # Fetch pending items
-    pending = fetch_pending_reviews(limit=10)
+    async def one(topic_code: str) -> Optional[Dict[str, Any]]:
+        evidence_statements = get_evidence_for_topic(topic_code) or [f"Demonstrate understanding of {topic_code}"]
+        async with sem:
+            try:
+                return await asyncio.to_thread(generate_item_with_context, topic_code, evidence_statements)
+            except Exception as e:
+                print(f"❌ Generation failed for {topic_code}: {e}")
+                return None
     
-    if not pending:
-        print("No items pending review")
+    return await asyncio.gather(*[one(tc) for tc in topic_codes])
+
+
+async def batch_generation_interface():
+    """Generate several items for a topic concurrently and print a batch report."""
+    
+    topic = input("Topic code (e.g., TP.2): ").strip()
+    try:
+        count = int(input("Number of items: ").strip())
+    except ValueError:
+        print("Invalid count")
         return
     
-    print(f"Found {len(pending)} items awaiting review:\n")
+    print(f"\nGenerating {count} items for {topic}...")
+    results = await generate_batch([topic] * count)
+    items = [item for item in results if item]
     
-    for i, item in enumerate(pending, 1):
-        print(f"{i}. {item.get('topic', 'N/A')} | Score: {item.get('quality_score', 0):.2f} | ID: {item.get('id', 'N/A')[:8]}")
+    print(f"✅ Generated {len(items)}/{count} items\n")
+    print(generate_batch_report(f"cli-{topic}", items))
+
+
+async def _review_producer(queue: asyncio.Queue, page_size: int = 10):
+    """
+    Prefetch pending items into the queue while the reviewer works on the current one.
     
-    # Select item to review
-    selection = input(f"\nSelect item to review (1-{len(pending)}) or 'q' to quit: ").strip()
+    fetch_pending_reviews has no offset, so each page asks for a larger limit and
+    skips items already queued. A None sentinel marks the end of the queue.
+    """
+    seen = set()
+    limit = page_size
+    while True:
+        try:
+            page = await asyncio.to_thread(fetch_pending_reviews, limit=limit)
+        except Exception as e:
+            print(f"❌ Failed to fetch pending reviews: {e}")
+            break
+        for item in page:
+            if item.get('id') not in seen:
+                seen.add(item.get('id'))
+                await queue.put(item)
+        if len(page) < limit:
+            break
+        limit += page_size
+    await queue.put(None)
+
+
+async def batch_review_interface():
+    """Interactive interface for reviewing pending items."""
     
-    if selection.lower() == 'q':
-        return
+    print(f"\n{'='*60}")
+    print("PENDING REVIEW QUEUE")
+    print(f"{'='*60}\n")
     
+    # Producer keeps up to one page of items buffered ahead of the reviewer
+    queue: asyncio.Queue = asyncio.Queue(maxsize=10)
+    producer = asyncio.create_task(_review_producer(queue, page_size=10))
+    
+    shown = 0
     try:
-        idx = int(selection) - 1
-        if 0 <= idx < len(pending):
-            item = pending[idx]
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            shown += 1
             
             # Display full item
-            print(f"\n{'='*60}")
-            print(f"REVIEWING ITEM {idx + 1}")
-            print(f"{'='*60}\n")
-            print(f"ID: {item['id']}")
-            print(f"Topic: {item['topic']}")
-            print(f"Quality: {item.get('quality_score', 0):.2f} ({item.get('quality_tier', 'N/A')})")
-            print(f"\nStimulus:\n{item.get('stimulus', 'N/A')}\n")
-            print(f"Stem:\n{item.get('stem', 'N/A')}\n")
-            print(f"Options:")
-            for key, value in item.get('options', {}).items():
-                marker = " ✓" if key == item.get('correct_answer') else ""
-                print(f"  {key}. {value}{marker}")
-            print(f"\nRationale:\n{item.get('rationale', 'N/A')}\n")
+            _emit(
+                f"\n{'='*60}",
+                f"REVIEWING ITEM {shown}",
+                f"{'='*60}\n",
+                f"ID: {item['id']}",
+                *_item_detail_lines(item)
+            )
             
-            # Get decision
-            decision = input("Decision (approve/edit/reject): ").strip().lower()
-            explanation = input("Explanation: ").strip()
-            reviewer = input("Your email: ").strip()
+            # Read input off the event loop so the producer keeps prefetching
+            decision = (await asyncio.to_thread(input, "Decision (approve/edit/reject/skip/q): ")).strip().lower()
+            if decision == 'q':
+                break
+            if decision == 'skip':
+                continue
+            explanation = (await asyncio.to_thread(input, "Explanation: ")).strip()
+            reviewer = (await asyncio.to_thread(input, "Your email: ")).strip()
             
             # Submit
-            review_result = submit_review_decision(
+            review_result = await asyncio.to_thread(
+                submit_review_decision,
                 item_id=item['id'],
                 decision=decision if decision in ["approved", "rejected"] else "approved_with_edits",
                 explanation=explanation,
@@ -175,8 +270,11 @@ async def batch_review_interface():
             )
             
             print(f"\n✅ {review_result['message']}")
-    except (ValueError, IndexError):
-        print("Invalid selection")
+    finally:
+        producer.cancel()
+    
+    if shown == 0:
+        print("No items pending review")
 
 
 async def main():
@@ -193,6 +291,7 @@ async def main():
         print("  1. Generate and review single item")
         print("  2. Review pending items")
         print("  3. View analytics")
+        print("  4. Generate batch of items")
         print("  q. Quit")
         
         choice = input("\nSelect option: ").strip().lower()
@@ -207,9 +306,18 @@ async def main():
             await batch_review_interface()
         elif choice == '3':
             print("\n⚠️  Analytics dashboard not yet implemented")
+        elif choice == '4':
+            await batch_generation_interface()
         else:
             print("Invalid option")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JD-Next exam generation CLI")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk rubric context cache")
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        set_rubric_disk_cache(False)
+    
     asyncio.run(main())
@@ -0,0 +1,3 @@
+"""
+@ai_function tool wrappers used by the workflow agents.
+"""
@@ -0,0 +1,108 @@
+"""
+_cache.py
+
+Session-scoped result cache for deterministic @ai_function tools.
+Keyed by (tool_name, canonicalized_args) with LRU eviction and a TTL.
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+DEFAULT_MAXSIZE = 512
+DEFAULT_TTL_SECONDS = 600
+
+
+class ToolResultCache:
+    """Thread-safe LRU cache with per-entry expiry and per-tool hit/miss counters."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Tuple[bool, Any]:
+        with self._lock:
+            stats = self._stats.setdefault(key[0], {"hits": 0, "misses": 0})
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            stats["misses"] += 1
+            return False, None
+
+    def set(self, key: Tuple[str, str], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def invalidate(self, tool_name: str) -> None:
+        """Drop every cached result of one tool, keeping its hit/miss counters."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == tool_name]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for name, counts in self._stats.items():
+                total = counts["hits"] + counts["misses"]
+                tools[name] = {
+                    "hits": counts["hits"],
+                    "misses": counts["misses"],
+                    "hit_rate": (counts["hits"] / total * 100) if total > 0 else 0.0
+                }
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "tools": tools
+            }
+
+
+TOOL_CACHE = ToolResultCache()
+
+
+def _canonicalize(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """Bind call arguments to the signature so positional and keyword calls share a key."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, default=str)
+
+
+def cached_tool(func: Callable) -> Callable:
+    """
+    Cache a tool's results in TOOL_CACHE.
+    
+    Apply beneath @ai_function. Cached results are shared between callers and
+    must not be mutated.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__, _canonicalize(signature, args, kwargs))
+        hit, value = TOOL_CACHE.get(key)
+        if hit:
+            return value
+        value = func(*args, **kwargs)
+        TOOL_CACHE.set(key, value)
+        return value
+
+    return wrapper
@@ -4,14 +4,34 @@ analytics_tools.py
 @ai_function tools for metrics, analytics, and reporting.
 """
 
-import sys
+import io
 import os
-from typing import Dict, Any, List, Optional
+import json
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; stdlib json gives identical results, just slower
+    _json_loads = json.loads
+
+# Persist compiled kernels across CLI runs; must be set before numba is imported
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.expanduser("~/.cache/aspenmind/numba"))
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional; _dimension_averages falls back to NumPy reductions
+    njit = None
 
 from agent_framework import ai_function
 
+from ._cache import TOOL_CACHE
+from .review_tools import get_review_metrics, analyze_rejections
+
 
 @ai_function
 def calculate_generation_success_rate(batch_items: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -39,11 +59,17 @@ def calculate_generation_success_rate(batch_items: List[Dict[str, Any]]) -> Dict
             "diversity_failures": 0
         }
     
-    successful = sum(1 for item in batch_items if item.get("quality_tier") in ["gold", "silver", "bronze"])
-    diversity_fails = sum(1 for item in batch_items if item.get("similarity_at_generation", 0.0) >= 0.75)
+    tiers = np.array([item.get("quality_tier") for item in batch_items], dtype=object)
+    similarities = np.fromiter(
+        (item.get("similarity_at_generation", 0.0) for item in batch_items), dtype=np.float64, count=total
+    )
+    attempts = np.fromiter(
+        (item.get("generation_attempt", 1) for item in batch_items), dtype=np.int32, count=total
+    )
     
-    attempts = [item.get("generation_attempt", 1) for item in batch_items]
-    avg_attempts = sum(attempts) / len(attempts) if attempts else 1.0
+    successful = int(np.isin(tiers, ("gold", "silver", "bronze")).sum())
+    diversity_fails = int((similarities >= 0.75).sum())
+    avg_attempts = float(attempts.mean())
     
     return {
         "total_attempts": total,
@@ -54,59 +80,120 @@ def calculate_generation_success_rate(batch_items: List[Dict[str, Any]]) -> Dict
     }
 
 
-@ai_function
-def analyze_quality_distribution(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+_DIMENSIONS = (
+    "clarity",
+    "cognitive_level",
+    "evidence_alignment",
+    "plausibility",
+    "legal_accuracy",
+    "scenario_quality",
+    "rationale_quality",
+    "overall"
+)
+_DIMENSION_SET = frozenset(_DIMENSIONS)
+_DIMENSION_INDEX = {dim: col for col, dim in enumerate(_DIMENSIONS)}
+
+
+def _extract_score_matrix(items: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[str]]:
     """
-    Analyze quality score distribution across dimensions.
+    Parse each item's quality_scores_json once into an (items x dimensions) matrix.
     
-    Args:
-        items: List of items with quality_scores_json field
+    Missing or unparseable scores are left as NaN so they are excluded from averages.
+    The matrix is float32 in column-major order, so each dimension is one contiguous
+    buffer for the column reductions (NumPy or numba) that consume it.
     
     Returns:
-        Dictionary with dimension averages and tier distribution
+        Tuple of (float32 score matrix, list of dimension names in column order)
     """
-    import json
-    
-    dimension_scores = {
-        "clarity": [],
-        "cognitive_level": [],
-        "evidence_alignment": [],
-        "plausibility": [],
-        "legal_accuracy": [],
-        "scenario_quality": [],
-        "rationale_quality": [],
-        "overall": []
-    }
-    
-    tier_counts = {}
+    scores = np.full((len(items), len(_DIMENSIONS)), np.nan, dtype=np.float32, order="F")
     
-    for item in items:
-        # Parse quality scores
+    for row, item in enumerate(items):
         scores_json = item.get("quality_scores_json", "{}")
         try:
-            scores = json.loads(scores_json) if isinstance(scores_json, str) else scores_json
-            for dim in dimension_scores.keys():
-                if dim in scores and "score" in scores[dim]:
-                    dimension_scores[dim].append(scores[dim]["score"])
+            parsed = _json_loads(scores_json) if isinstance(scores_json, str) else scores_json
+            # Only visit dimensions the item actually has
+            for dim in parsed.keys() & _DIMENSION_SET:
+                entry = parsed[dim]
+                if "score" in entry:
+                    scores[row, _DIMENSION_INDEX[dim]] = entry["score"]
         except:
             pass
-        
-        # Count tiers
-        tier = item.get("quality_tier", "unknown")
-        tier_counts[tier] = tier_counts.get(tier, 0) + 1
     
-    # Calculate averages
-    dimension_averages = {}
-    for dim, scores in dimension_scores.items():
-        dimension_averages[dim] = sum(scores) / len(scores) if scores else 0.0
+    return scores, list(_DIMENSIONS)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _nanmean_cols(mat):
+        n_rows, n_cols = mat.shape
+        averages = np.zeros(n_cols, dtype=np.float64)
+        counts = np.zeros(n_cols, dtype=np.int64)
+        for j in prange(n_cols):
+            total = 0.0
+            count = 0
+            for i in range(n_rows):
+                value = mat[i, j]
+                if not np.isnan(value):
+                    total += value
+                    count += 1
+            if count > 0:
+                averages[j] = total / count
+            counts[j] = count
+        return averages, counts
+else:
+    _nanmean_cols = None
+
+
+def _dimension_averages(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return per-dimension (averages, counts), with 0.0 for dimensions without scores."""
+    if _nanmean_cols is not None:
+        return _nanmean_cols(scores)
+    
+    counts = (~np.isnan(scores)).sum(axis=0)
+    totals = np.nansum(scores, axis=0, dtype=np.float64)
+    averages = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    return averages, counts
+
+
+def _compute_dimension_means(items: List[Dict[str, Any]]) -> Dict[str, Tuple[float, int]]:
+    """Map each dimension to (average score, number of items scored) in one parse of the batch."""
+    scores, dimensions = _extract_score_matrix(items)
+    averages, counts = _dimension_averages(scores)
+    return {dim: (float(avg), int(count)) for dim, avg, count in zip(dimensions, averages, counts)}
+
+
+def _quality_distribution(items: List[Dict[str, Any]], means: Dict[str, Tuple[float, int]]) -> Dict[str, Any]:
+    tier_counts = dict(Counter(item.get("quality_tier", "unknown") for item in items))
     
     return {
-        "dimension_averages": dimension_averages,
+        "dimension_averages": {dim: avg for dim, (avg, _) in means.items()},
         "tier_distribution": tier_counts,
         "total_items": len(items)
     }
 
 
+def _weak_dimensions(means: Dict[str, Tuple[float, int]], threshold: float) -> List[str]:
+    return [
+        f"{dim} (avg: {avg:.2f})"
+        for dim, (avg, count) in means.items()
+        if count > 0 and avg < threshold
+    ]
+
+
+@ai_function
+def analyze_quality_distribution(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Analyze quality score distribution across dimensions.
+    
+    Args:
+        items: List of items with quality_scores_json field
+    
+    Returns:
+        Dictionary with dimension averages and tier distribution
+    """
+    return _quality_distribution(items, _compute_dimension_means(items))
+
+
 @ai_function
 def identify_weak_dimensions(items: List[Dict[str, Any]], threshold: float = 3.5) -> List[str]:
     """
@@ -119,37 +206,7 @@ def identify_weak_dimensions(items: List[Dict[str, Any]], threshold: float = 3.5
     Returns:
         List of dimension names scoring below threshold
     """
-    import json
-    
-    dimension_scores = {
-        "clarity": [],
-        "cognitive_level": [],
-        "evidence_alignment": [],
-        "plausibility": [],
-        "legal_accuracy": [],
-        "scenario_quality": [],
-        "rationale_quality": [],
-        "overall": []
-    }
-    
-    for item in items:
-        scores_json = item.get("quality_scores_json", "{}")
-        try:
-            scores = json.loads(scores_json) if isinstance(scores_json, str) else scores_json
-            for dim in dimension_scores.keys():
-                if dim in scores and "score" in scores[dim]:
-                    dimension_scores[dim].append(scores[dim]["score"])
-        except:
-            pass
-    
-    weak_dimensions = []
-    for dim, scores in dimension_scores.items():
-        if scores:
-            avg = sum(scores) / len(scores)
-            if avg < threshold:
-                weak_dimensions.append(f"{dim} (avg: {avg:.2f})")
-    
-    return weak_dimensions
+    return _weak_dimensions(_compute_dimension_means(items), threshold)
 
 
 @ai_function
@@ -165,14 +222,12 @@ def track_batch_progress(batch_id: str, current_items: List[Dict[str, Any]]) ->
         Dictionary with progress metrics
     """
     total = len(current_items)
-    pending_review = sum(1 for item in current_items if item.get("review_status") == "pending_review")
-    approved = sum(1 for item in current_items if item.get("review_status") in ["approved", "approved_with_edits"])
-    rejected = sum(1 for item in current_items if item.get("review_status") == "rejected")
+    statuses = np.array([item.get("review_status") for item in current_items], dtype=object)
+    pending_review = int((statuses == "pending_review").sum())
+    approved = int(np.isin(statuses, ("approved", "approved_with_edits")).sum())
+    rejected = int((statuses == "rejected").sum())
     
-    quality_tiers = {}
-    for item in current_items:
-        tier = item.get("quality_tier", "unknown")
-        quality_tiers[tier] = quality_tiers.get(tier, 0) + 1
+    quality_tiers = dict(Counter(item.get("quality_tier", "unknown") for item in current_items))
     
     return {
         "batch_id": batch_id,
@@ -201,35 +256,97 @@ def generate_batch_report(batch_id: str, items: List[Dict[str, Any]]) -> str:
         return f"Batch {batch_id}: No items generated"
     
     total = len(items)
-    quality_dist = {}
-    review_dist = {}
-    
-    for item in items:
-        tier = item.get("quality_tier", "unknown")
-        status = item.get("review_status", "unknown")
-        quality_dist[tier] = quality_dist.get(tier, 0) + 1
-        review_dist[status] = review_dist.get(status, 0) + 1
-    
-    report_lines = [
-        f"=== Batch Report: {batch_id} ===",
-        f"Total Items: {total}",
-        "",
-        "Quality Distribution:",
-    ]
+    quality_dist = Counter(item.get("quality_tier", "unknown") for item in items)
+    review_dist = Counter(item.get("review_status", "unknown") for item in items)
+    
+    buf = io.StringIO()
+    w = buf.write
+    w(f"=== Batch Report: {batch_id} ===\n")
+    w(f"Total Items: {total}\n")
+    w("\n")
+    w("Quality Distribution:")
     
     for tier in ["gold", "silver", "bronze", "needs_revision"]:
-        count = quality_dist.get(tier, 0)
+        count = quality_dist[tier]
         if count > 0:
-            pct = (count / total) * 100
-            report_lines.append(f"  {tier}: {count} ({pct:.1f}%)")
+            w(f"\n  {tier}: {count} ({count / total * 100:.1f}%)")
     
-    report_lines.append("")
-    report_lines.append("Review Status:")
+    w("\n")
+    w("\nReview Status:")
     
     for status in ["approved", "approved_with_edits", "pending_review", "rejected"]:
-        count = review_dist.get(status, 0)
+        count = review_dist[status]
         if count > 0:
-            pct = (count / total) * 100
-            report_lines.append(f"  {status}: {count} ({pct:.1f}%)")
+            w(f"\n  {status}: {count} ({count / total * 100:.1f}%)")
     
-    return "\n".join(report_lines)
+    return buf.getvalue()
+
+
+@ai_function
+def compute_full_analytics(
+    batch_id: str,
+    items: List[Dict[str, Any]],
+    topic: Optional[str] = None,
+    weak_threshold: float = 3.5
+) -> Dict[str, Any]:
+    """
+    Compute every deterministic batch metric in one call.
+    
+    Runs the success-rate, quality-distribution, weak-dimension, progress, and
+    report calculations in Python, plus the index-wide review metrics and
+    rejection patterns, so the agent needs a single tool call before writing
+    its recommendations.
+    
+    Args:
+        batch_id: Batch identifier
+        items: All items in the batch
+        topic: Optional topic filter for rejection analysis (e.g., "TP.2")
+        weak_threshold: Score threshold for identifying weak dimensions
+    
+    Returns:
+        Dictionary with:
+        - success_metrics: calculate_generation_success_rate result
+        - quality_distribution: analyze_quality_distribution result
+        - weak_dimensions: identify_weak_dimensions result
+        - batch_progress: track_batch_progress result
+        - review_metrics: get_review_metrics result (or {"error": ...})
+        - rejections: analyze_rejections result (or [] if unavailable)
+        - batch_report: generate_batch_report text
+    """
+    # Parse quality scores once and share the means across both dimension analyses
+    means = _compute_dimension_means(items)
+    
+    try:
+        review_metrics = get_review_metrics()
+    except Exception as e:
+        review_metrics = {"error": str(e)}
+    
+    try:
+        rejections = analyze_rejections(topic=topic)
+    except Exception:
+        rejections = []
+    
+    return {
+        "success_metrics": calculate_generation_success_rate(items),
+        "quality_distribution": _quality_distribution(items, means),
+        "weak_dimensions": _weak_dimensions(means, weak_threshold),
+        "batch_progress": track_batch_progress(batch_id, items),
+        "review_metrics": review_metrics,
+        "rejections": rejections,
+        "batch_report": generate_batch_report(batch_id, items)
+    }
+
+
+@ai_function
+def get_tool_cache_metrics() -> Dict[str, Any]:
+    """
+    Report hit/miss metrics for cached lookup tools (rubric context, similar items).
+    
+    Returns:
+        Dictionary with:
+        - size: int (entries currently cached)
+        - maxsize: int
+        - ttl_seconds: float
+        - tools: Dict mapping tool name to hits, misses, and hit_rate (percentage)
+    """
+    return TOOL_CACHE.stats()
@@ -5,57 +5,111 @@ generation_tools.py
 These wrap existing functions from the parent directory's retrieval and generation modules.
 """
 
-import sys
-import os
+import asyncio
 from typing import List, Dict, Any, Optional
 import logging
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Add parent directory to path to import existing modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# Repository root on sys.path for the existing retrieval and generation modules
+from .. import _bootstrap  # noqa: F401
 
 from agent_framework import ai_function
 from retrieval import (
     retrieve_rubric_chunks,
     retrieve_similar_items,
     embed,
-    retrieve_comprehensive_context
+    embed_batch,
+    get_cached_comprehensive_context,
+    invalidate_rubric_cache,
+    set_context_disk_cache,
+    SIMILARITY_EMBEDDING_DIMENSIONS
 )
 
 # Import generation functions from parent directory
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from generate_items_v2 import (
     generate_jdnext_item,
-    calculate_scenario_similarity,
     check_scenario_diversity
 )
 
-# Add config directory to path for evidence mapping
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config.evidence_map import get_evidence_for_topic as get_evidence_statements_static
+from ..config.evidence_map import get_evidence_for_topic as get_evidence_statements_static
+from ._cache import TOOL_CACHE, cached_tool
 
-# Cache rubric rules to avoid repeated fetching
-_RUBRIC_CACHE = {}
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    # datasketch is optional; without it check_diversity embeds every previous stimulus
+    MinHashLSH = None
 
-def get_cached_comprehensive_context(topic_code: str, query_text: str, k_examples: int = 5, k_items: int = 8):
-    """Get comprehensive context with caching for rubric rules."""
-    cache_key = topic_code
+# Retry temperatures by attempt (1-indexed): start at 0.4, +0.2 per attempt, capped at 0.9
+_TEMP_SCHEDULE = tuple(min(0.9, 0.4 + i * 0.2) for i in range(8))
+
+# MinHash LSH over word sets of previous stimuli, used to shrink large candidate
+# sets in check_diversity; smaller sets (and sets with no LSH match) are checked exactly
+_LSH_THRESHOLD = 0.5
+_LSH_NUM_PERM = 64
+_LSH_MIN_STIMULI = 64
+
+
+def _normalized_stimulus_embeddings(stimuli: List[str]) -> np.ndarray:
+    """
+    Return an (N, D) float32 matrix of L2-normalized embeddings for non-empty stimuli.
     
-    if cache_key not in _RUBRIC_CACHE:
-        logger.info(f"[CACHE MISS] Loading rubric rules for {topic_code}")
-        _RUBRIC_CACHE[cache_key] = retrieve_comprehensive_context(
-            topic_code=topic_code,
-            query_text=query_text,
-            k_examples=k_examples,
-            k_items=k_items
-        )
-    else:
-        logger.info(f"[CACHE HIT] Using cached rubric rules for {topic_code}")
+    Stimuli are truncated to 200 chars (as in calculate_scenario_similarity) and
+    embedded at the reduced SIMILARITY_EMBEDDING_DIMENSIONS size; embed_batch's
+    content-hash cache means only cache misses are sent, in a single request.
+    """
+    vectors = np.array(
+        embed_batch([s[:200] for s in stimuli], dimensions=SIMILARITY_EMBEDDING_DIMENSIONS),
+        dtype=np.float32
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return vectors
+
+
+def set_rubric_disk_cache(enabled: bool) -> None:
+    """Enable or disable the on-disk comprehensive context cache (e.g. for --no-cache)."""
+    set_context_disk_cache(enabled)
+
+
+def invalidate_rubric_context_cache() -> None:
+    """
+    Drop every cached rubric context: retrieval's rules and comprehensive contexts
+    (in process and on disk) and cached get_rubric_context results.
+    """
+    invalidate_rubric_cache()
+    TOOL_CACHE.invalidate("get_rubric_context")
+
+
+def _stimulus_minhash(text: str) -> "MinHash":
+    minhash = MinHash(num_perm=_LSH_NUM_PERM)
+    for token in set(text.lower().split()):
+        minhash.update(token.encode("utf-8"))
+    return minhash
+
+
+def _lsh_candidates(new_item_stimulus: str, previous_stimuli: List[str]) -> Optional[List[str]]:
+    """
+    Return the previous stimuli that share enough vocabulary with the new one to be
+    worth an embedding comparison.
     
-    return _RUBRIC_CACHE[cache_key]
+    The index is built per call from previous_stimuli. Returns None (compare against
+    every previous stimulus) if datasketch is unavailable, if there are fewer than
+    _LSH_MIN_STIMULI stimuli, or if nothing matches: word-set Jaccard misses
+    paraphrases that embedding similarity catches, so an empty result proves nothing.
+    """
+    if MinHashLSH is None or len(previous_stimuli) < _LSH_MIN_STIMULI:
+        return None
+    
+    lsh = MinHashLSH(threshold=_LSH_THRESHOLD, num_perm=_LSH_NUM_PERM)
+    for index, text in enumerate(previous_stimuli):
+        lsh.insert(index, _stimulus_minhash(text[:200]))
+    matches = lsh.query(_stimulus_minhash(new_item_stimulus[:200]))
+    
+    return [previous_stimuli[index] for index in sorted(matches)] or None
 
 
 @ai_function
@@ -129,11 +183,53 @@ def check_diversity(
             "message": "No previous items to compare against"
         }
     
-    # Calculate similarity against each previous stimulus
+    if new_item_stimulus:
+        candidates = _lsh_candidates(new_item_stimulus, [s for s in previous_stimuli if s])
+        if candidates is not None:
+            logger.info(f"[TOOL CALL] LSH pre-filter kept {len(candidates)}/{len(previous_stimuli)} candidates")
+            previous_stimuli = candidates
+    
+    try:
+        previous_embeddings = precompute_stimulus_embeddings(previous_stimuli)
+    except Exception as e:
+        logger.warning(f"[TOOL RESULT] Similarity calculation failed: {e}")
+        previous_embeddings = None
+    
+    return check_diversity_precomputed(new_item_stimulus, previous_embeddings, similarity_threshold)
+
+
+def precompute_stimulus_embeddings(stimuli: List[str]) -> np.ndarray:
+    """
+    Embed a list of stimuli up front as an (N, D) L2-normalized float32 matrix.
+    
+    Empty stimuli are skipped (they have zero similarity to everything). Call this
+    once per batch or session and pass the matrix to check_diversity_precomputed,
+    so previous stimuli are never re-embedded per check.
+    """
+    stimuli = [s for s in stimuli if s]
+    if not stimuli:
+        return np.empty((0, 0), dtype=np.float32)
+    return _normalized_stimulus_embeddings(stimuli)
+
+
+def check_diversity_precomputed(
+    new_item_stimulus: str,
+    previous_embeddings: Optional[np.ndarray],
+    similarity_threshold: float = 0.75
+) -> Dict[str, Any]:
+    """
+    Same as check_diversity, but against a matrix from precompute_stimulus_embeddings.
+    
+    Only the new stimulus is embedded; similarity to every previous stimulus is a
+    single matrix-vector product.
+    """
     max_similarity = 0.0
-    for prev_stimulus in previous_stimuli:
-        similarity = calculate_scenario_similarity(new_item_stimulus, prev_stimulus)
-        max_similarity = max(max_similarity, similarity)
+    if new_item_stimulus and previous_embeddings is not None and len(previous_embeddings):
+        try:
+            new_vec = _normalized_stimulus_embeddings([new_item_stimulus])[0]
+            max_similarity = float((previous_embeddings @ new_vec).max())
+        except Exception as e:
+            logger.warning(f"[TOOL RESULT] Similarity calculation failed: {e}")
     
     is_diverse = max_similarity < similarity_threshold
     
@@ -146,6 +242,64 @@ def check_diversity(
     }
 
 
+@ai_function
+def check_diversity_batch(
+    stimuli: List[str],
+    similarity_threshold: float = 0.75
+) -> Dict[str, Any]:
+    """
+    Check a whole batch of stimuli for pairwise diversity in one pass.
+    
+    All stimuli are embedded in a single request and compared with one
+    cosine-similarity matrix product, instead of one check_diversity call per item.
+    
+    Args:
+        stimuli: Stimulus texts of all items in the batch
+        similarity_threshold: Maximum allowed similarity (default: 0.75)
+    
+    Returns:
+        Dictionary with:
+        - is_diverse: bool (True if no pair reaches the threshold)
+        - max_similarity: float (highest pairwise similarity found)
+        - similar_pairs: List of {"i", "j", "similarity"} for pairs at or above the threshold (i < j)
+        - message: str (explanation)
+    """
+    logger.info(f"[TOOL CALL] check_diversity_batch(count={len(stimuli)}, threshold={similarity_threshold})")
+    
+    # Empty stimuli cannot be embedded and never count as similar
+    indices = [i for i, s in enumerate(stimuli) if s]
+    if len(indices) < 2:
+        return {
+            "is_diverse": True,
+            "max_similarity": 0.0,
+            "similar_pairs": [],
+            "message": "Fewer than two stimuli to compare"
+        }
+    
+    embeddings = _normalized_stimulus_embeddings([stimuli[i] for i in indices])
+    similarity = embeddings @ embeddings.T
+    
+    upper = np.triu_indices(len(indices), k=1)
+    pair_similarities = similarity[upper]
+    max_similarity = float(pair_similarities.max())
+    
+    similar_pairs = [
+        {"i": indices[a], "j": indices[b], "similarity": float(similarity[a, b])}
+        for a, b in zip(*upper)
+        if similarity[a, b] >= similarity_threshold
+    ]
+    is_diverse = not similar_pairs
+    
+    logger.info(f"[TOOL RESULT] Batch diversity check: {'PASSED' if is_diverse else 'FAILED'} - max_similarity={max_similarity:.3f}, similar_pairs={len(similar_pairs)}")
+    
+    return {
+        "is_diverse": is_diverse,
+        "max_similarity": max_similarity,
+        "similar_pairs": similar_pairs,
+        "message": f"Max pairwise similarity: {max_similarity:.3f} (threshold: {similarity_threshold})"
+    }
+
+
 @ai_function
 def retry_generation_for_diversity(
     topic_code: str,
@@ -171,8 +325,7 @@ def retry_generation_for_diversity(
         return None
     
     # Increase temperature with each attempt to encourage diversity
-    base_temp = 0.4
-    temperature = min(0.9, base_temp + (attempt_number - 1) * 0.2)
+    temperature = _TEMP_SCHEDULE[min(max(attempt_number - 1, 0), len(_TEMP_SCHEDULE) - 1)]
     
     # Generate with higher temperature
     return generate_item_with_context(
@@ -183,6 +336,109 @@ def retry_generation_for_diversity(
 
 
 @ai_function
+async def generate_items_batch(
+    topic_code: str,
+    count: int,
+    similarity_threshold: float = 0.75,
+    max_attempts: int = 3
+) -> Dict[str, Any]:
+    """
+    Generate a batch of diverse items for one topic in a single tool call.
+    
+    Evidence statements are fetched once for the batch, all items are generated
+    concurrently, and the diversity check runs afterwards in item order. Items that
+    are too similar to an already accepted item are regenerated with a higher
+    temperature via retry_generation_for_diversity.
+    
+    Args:
+        topic_code: Topic code (e.g., "TP.2")
+        count: Number of items to generate
+        similarity_threshold: Maximum allowed similarity (default: 0.75)
+        max_attempts: Maximum generation attempts per item (default: 3)
+    
+    Returns:
+        Dictionary with:
+        - items: List of accepted item dicts (with generation_attempt and similarity_at_generation)
+        - evidence_statements: Evidence statements used for the batch
+        - failed_count: int (items that could not be generated or made diverse)
+    """
+    logger.info(f"[TOOL CALL] generate_items_batch(topic_code={topic_code}, count={count})")
+    
+    evidence_statements = get_evidence_statements_static(topic_code)
+    
+    # Warm the rubric cache once so the concurrent generations all hit it
+    await asyncio.to_thread(
+        get_cached_comprehensive_context,
+        topic_code=topic_code,
+        query_text=f"Topic {topic_code}: {' '.join(evidence_statements[:2])}"
+    )
+    
+    async def _generate_one() -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.to_thread(generate_item_with_context, topic_code, evidence_statements)
+        except Exception as e:
+            logger.warning(f"[TOOL RESULT] Item generation failed: {e}")
+            return None
+    
+    candidates = await asyncio.gather(*[_generate_one() for _ in range(count)])
+    
+    # Embed every candidate stimulus in one request; the accept loop below then
+    # only grows a matrix of accepted embeddings instead of re-embedding them
+    try:
+        await asyncio.to_thread(
+            precompute_stimulus_embeddings,
+            [item.get("stimulus", "") for item in candidates if item]
+        )
+    except Exception as e:
+        logger.warning(f"[TOOL RESULT] Stimulus pre-embedding failed: {e}")
+    
+    accepted: List[Dict[str, Any]] = []
+    accepted_embeddings: Optional[np.ndarray] = None
+    failed = 0
+    
+    for item in candidates:
+        attempt = 1
+        while True:
+            if item:
+                stimulus = item.get("stimulus", "")
+                diversity = check_diversity_precomputed(stimulus, accepted_embeddings, similarity_threshold)
+                if diversity["is_diverse"]:
+                    item["generation_attempt"] = attempt
+                    item["similarity_at_generation"] = diversity["max_similarity"]
+                    accepted.append(item)
+                    if stimulus:
+                        try:
+                            new_row = precompute_stimulus_embeddings([stimulus])
+                            accepted_embeddings = new_row if accepted_embeddings is None else np.vstack([accepted_embeddings, new_row])
+                        except Exception as e:
+                            logger.warning(f"[TOOL RESULT] Stimulus embedding failed: {e}")
+                    break
+            
+            attempt += 1
+            if attempt > max_attempts:
+                failed += 1
+                break
+            
+            try:
+                item = await asyncio.to_thread(
+                    retry_generation_for_diversity,
+                    topic_code, evidence_statements, [], attempt, max_attempts
+                )
+            except Exception as e:
+                logger.warning(f"[TOOL RESULT] Item regeneration failed: {e}")
+                item = None
+    
+    logger.info(f"[TOOL RESULT] Batch generated - accepted={len(accepted)}, failed={failed}")
+    
+    return {
+        "items": accepted,
+        "evidence_statements": evidence_statements,
+        "failed_count": failed
+    }
+
+
+@ai_function
+@cached_tool
 def get_rubric_context(topic_code: str, evidence_text: str, k: int = 10) -> List[Dict[str, Any]]:
     """
     Retrieve relevant rubric chunks for a topic and evidence.
@@ -223,6 +479,7 @@ def get_evidence_for_topic_code(topic_code: str) -> List[str]:
 
 
 @ai_function
+@cached_tool
 def get_similar_items(topic_code: str, evidence_text: str, k: int = 5) -> List[Dict[str, Any]]:
     """
     Retrieve similar existing items for reference.
@@ -4,16 +4,19 @@ review_tools.py
 @ai_function tools for human review workflow and state management.
 """
 
-import sys
-import os
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, Final, List, Optional, Tuple
 from datetime import datetime, timezone
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import numpy as np
+
+# Repository root on sys.path for the existing retrieval and generation modules
+from .. import _bootstrap  # noqa: F401
 
 from agent_framework import ai_function
 from retrieval import (
     upload_item_to_index,
+    upload_items_batch,
     update_review_status,
     get_pending_review_items,
     get_approved_items,
@@ -22,6 +25,11 @@ from retrieval import (
 )
 
 
+# Quality tier ordering for batch_upload_items threshold filtering
+_TIER_LEVEL: Final[Dict[str, int]] = {"needs_revision": 0, "bronze": 1, "silver": 2, "gold": 3}
+_TIER_ALL_LEVEL: Final = -1
+
+
 @ai_function
 def upload_item_for_review(item: Dict[str, Any], review_status: str = "pending_review") -> Dict[str, str]:
     """
@@ -158,8 +166,40 @@ def get_review_metrics() -> Dict[str, Any]:
     return get_review_analytics()
 
 
+async def _upload_items_concurrently(
+    items: List[Dict[str, Any]],
+    review_status: str,
+    max_concurrency: int = 8
+) -> Tuple[List[str], List[str]]:
+    """
+    Upload items one per request, at most max_concurrency at a time.
+    
+    Throttled requests (503/429) are retried with backoff by the shared Azure
+    Search client in retrieval.py. Returns (uploaded IDs, skipped entries with
+    error messages).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _one(item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await asyncio.to_thread(upload_item_to_index, item, review_status=review_status)
+    
+    results = await asyncio.gather(*[_one(item) for item in items], return_exceptions=True)
+    
+    uploaded = []
+    skipped = []
+    for item, result in zip(items, results):
+        if isinstance(result, Exception):
+            skipped.append(f"{item.get('id', 'unknown')} (error: {str(result)})")
+        elif result["success"]:
+            uploaded.append(result["id"])
+        else:
+            skipped.append(f"{result['id']} (error: {result['error']})")
+    return uploaded, skipped
+
+
 @ai_function
-def batch_upload_items(
+async def batch_upload_items(
     items: List[Dict[str, Any]],
     review_status: str = "pending_review",
     quality_threshold: Optional[str] = None
@@ -179,27 +219,32 @@ def batch_upload_items(
         - skipped_count: int
         - items_uploaded: List of uploaded item IDs
     """
-    tier_hierarchy = {"needs_revision": 0, "bronze": 1, "silver": 2, "gold": 3}
-    threshold_level = tier_hierarchy.get(quality_threshold, -1) if quality_threshold and quality_threshold != "all" else -1
-    
-    uploaded = []
-    skipped = []
-    
-    for item in items:
-        # Check quality threshold
-        if threshold_level > -1:
-            item_tier = item.get("quality_tier", "needs_revision")
-            item_level = tier_hierarchy.get(item_tier, 0)
-            if item_level < threshold_level:
-                skipped.append(item.get("id", "unknown"))
-                continue
-        
-        # Upload item
-        try:
-            upload_item_to_index(item, review_status=review_status)
-            uploaded.append(item.get("id", "unknown"))
-        except Exception as e:
-            skipped.append(f"{item.get('id', 'unknown')} (error: {str(e)})")
+    threshold_level = _TIER_LEVEL.get(quality_threshold, _TIER_ALL_LEVEL) if quality_threshold and quality_threshold != "all" else _TIER_ALL_LEVEL
+    
+    # Drop tier-rejected items before any upload work: map tiers to levels once,
+    # then split the batch with one vectorized comparison
+    if threshold_level > _TIER_ALL_LEVEL:
+        levels = np.fromiter(
+            (_TIER_LEVEL.get(item.get("quality_tier", "needs_revision"), 0) for item in items),
+            dtype=np.int8, count=len(items)
+        )
+        mask = levels >= threshold_level
+        qualified = [items[i] for i in np.flatnonzero(mask)]
+        skipped = [items[i].get("id", "unknown") for i in np.flatnonzero(~mask)]
+    else:
+        qualified = list(items)
+        skipped = []
+    
+    # Upload all qualifying items through the chunked, throttle-aware bulk uploader
+    # (per-item failures come back in its results); if the bulk path itself fails,
+    # fall back to concurrent per-item uploads so one bad item does not block the rest
+    try:
+        result = await asyncio.to_thread(upload_items_batch, qualified, review_status=review_status)
+        uploaded = [r["id"] for r in result["results"] if r["success"]]
+        skipped.extend(f"{r['id']} (error: {r['error']})" for r in result["failures"])
+    except Exception:
+        uploaded, errors = await _upload_items_concurrently(qualified, review_status)
+        skipped.extend(errors)
     
     return {
         "uploaded_count": len(uploaded),
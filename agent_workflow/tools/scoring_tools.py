@@ -4,16 +4,60 @@ scoring_tools.py
 @ai_function tools for quality scoring and evaluation.
 """
 
-import sys
-import os
+import asyncio
+import bisect
+from itertools import islice
 from typing import Dict, Any, List
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import numpy as np
+
+# Repository root on sys.path for the existing retrieval and generation modules
+from .. import _bootstrap  # noqa: F401
 
 from agent_framework import ai_function
-from generate_items_v2 import validate_and_refine_item
+from generate_items_v2 import validate_and_refine_items
 from retrieval import format_rules_for_prompt, retrieve_all_rubric_rules
 
+from .generation_tools import (
+    check_diversity_precomputed,
+    generate_item_with_context,
+    invalidate_rubric_context_cache,
+    precompute_stimulus_embeddings
+)
+
+
+# Tier lower bounds (ascending) and the tier for each bucket: score < 2.5,
+# 2.5 <= score < 3.5, 3.5 <= score < 4.5, score >= 4.5
+_TIER_THRESHOLDS = (2.5, 3.5, 4.5)
+_TIERS = ("needs_revision", "bronze", "silver", "gold")
+_TIERS_ARRAY = np.array(_TIERS, dtype=object)
+
+# Structural validation constants
+_REQUIRED_FIELDS = ("stimulus", "stem", "options", "correct_answer", "rationale", "topic", "evidence")
+_OPTION_KEYS = frozenset("ABCD")
+_MIN_TEXT_LENGTHS = {"stem": (10, "Stem is too short"), "rationale": (20, "Rationale is too short")}
+
+
+@ai_function
+def refresh_rubric_cache() -> Dict[str, str]:
+    """
+    Discard every cached copy of the rubric so scoring and generation fetch it again.
+    
+    Use this after rubric rules have been edited in the index. Clears cached
+    get_rubric_context results and retrieval's rule, rubric-chunk, and
+    comprehensive context caches (in process and on disk).
+    
+    Returns:
+        Dictionary with:
+        - status: "success"
+        - message: Confirmation message
+    """
+    invalidate_rubric_context_cache()
+    return {
+        "status": "success",
+        "message": "Rubric rules will be reloaded on the next scoring or generation call"
+    }
+
 
 @ai_function
 def score_item(item: Dict[str, Any]) -> Dict[str, Any]:
@@ -40,19 +84,40 @@ def score_item(item: Dict[str, Any]) -> Dict[str, Any]:
         - quality_scores: Dict of dimension scores
         - improvement_suggestions: List of suggestions
     """
-    # Get rubric context for scoring
-    all_rules = retrieve_all_rubric_rules()
-    rubric_context = format_rules_for_prompt(all_rules)
+    return score_items_batch([item])[0]
+
+
+def _chunks(items: List[Dict[str, Any]], size: int):
+    """Yield consecutive lists of at most size items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@ai_function
+def score_items_batch(items: List[Dict[str, Any]], batch_size: int = 8) -> List[Dict[str, Any]]:
+    """
+    Score several exam items, packing up to batch_size items into each LLM request.
+    
+    Uses the same 8 quality dimensions as score_item, but one scoring round-trip
+    covers a whole chunk of items instead of one call per item.
+    
+    Args:
+        items: List of item dictionaries with stimulus, stem, options, rationale
+        batch_size: Maximum number of items scored per LLM request (default: 8)
     
-    # Use the scoring function from generate_items_v2
-    scored_item = validate_and_refine_item(
-        item=item,
-        rubric_context=rubric_context,
-        topic_code=item.get('topic', ''),
-        evidence_statements=item.get('evidence_statements', [])
-    )
+    Returns:
+        List (same order as items) of quality dictionaries, as returned by score_item
+    """
+    # Get rubric context for scoring (cached; see refresh_rubric_cache)
+    rubric_context = format_rules_for_prompt(retrieve_all_rubric_rules())
     
-    return scored_item.get('quality', {})
+    qualities = []
+    for chunk in _chunks(items, max(1, batch_size)):
+        # Use the scoring function from generate_items_v2
+        scored = validate_and_refine_items(chunk, rubric_context)
+        qualities.extend(scored_item.get('quality', {}) for scored_item in scored)
+    return qualities
 
 
 @ai_function
@@ -66,14 +131,44 @@ def calculate_quality_tier(overall_score: float) -> str:
     Returns:
         Tier: "gold" (≥4.5), "silver" (3.5-4.5), "bronze" (2.5-3.5), "needs_revision" (<2.5)
     """
-    if overall_score >= 4.5:
-        return "gold"
-    elif overall_score >= 3.5:
-        return "silver"
-    elif overall_score >= 2.5:
-        return "bronze"
-    else:
-        return "needs_revision"
+    return _TIERS[bisect.bisect_right(_TIER_THRESHOLDS, overall_score)]
+
+
+def calculate_quality_tiers(scores: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_quality_tier: map an array of overall scores to tier names."""
+    return _TIERS_ARRAY[np.searchsorted(_TIER_THRESHOLDS, scores, side="right")]
+
+
+def _missing_fields(item: Dict[str, Any]):
+    """Yield each required field that is absent or empty."""
+    return (f for f in _REQUIRED_FIELDS if not item.get(f))
+
+
+def _option_errors(item: Dict[str, Any]):
+    """Yield structural errors in the options dict and correct answer."""
+    if "options" in item:
+        options = item["options"]
+        if not isinstance(options, dict):
+            yield "Options must be a dictionary"
+        elif len(options) < 4:
+            yield "Must have at least 4 options"
+        elif not _OPTION_KEYS.issubset(options.keys()):
+            yield "Options must include A, B, C, D"
+        
+        if "correct_answer" in item and item["correct_answer"] not in options:
+            yield f"Correct answer '{item['correct_answer']}' not in options"
+
+
+def _length_errors(item: Dict[str, Any]):
+    """Yield an error for each text field shorter than its minimum length."""
+    for field, (min_length, message) in _MIN_TEXT_LENGTHS.items():
+        if field in item and len(item[field]) < min_length:
+            yield message
+
+
+def is_valid_item(item: Dict[str, Any]) -> bool:
+    """Fast validity check: stops at the first problem validate_item_structure would report."""
+    return not any(_missing_fields(item)) and not any(_option_errors(item)) and not any(_length_errors(item))
 
 
 @ai_function
@@ -90,32 +185,8 @@ def validate_item_structure(item: Dict[str, Any]) -> Dict[str, Any]:
         - missing_fields: List of missing required fields
         - validation_errors: List of validation error messages
     """
-    required_fields = ["stimulus", "stem", "options", "correct_answer", "rationale", "topic", "evidence"]
-    missing = [f for f in required_fields if not item.get(f)]
-    
-    errors = []
-    
-    # Check options structure
-    if "options" in item:
-        options = item["options"]
-        if not isinstance(options, dict):
-            errors.append("Options must be a dictionary")
-        elif len(options) < 4:
-            errors.append("Must have at least 4 options")
-        elif not all(k in options for k in ["A", "B", "C", "D"]):
-            errors.append("Options must include A, B, C, D")
-    
-    # Check correct answer
-    if "correct_answer" in item and "options" in item:
-        if item["correct_answer"] not in item["options"]:
-            errors.append(f"Correct answer '{item['correct_answer']}' not in options")
-    
-    # Check text length
-    if "stem" in item and len(item["stem"]) < 10:
-        errors.append("Stem is too short")
-    
-    if "rationale" in item and len(item["rationale"]) < 20:
-        errors.append("Rationale is too short")
+    missing = list(_missing_fields(item))
+    errors = [*_option_errors(item), *_length_errors(item)]
     
     return {
         "is_valid": len(missing) == 0 and len(errors) == 0,
@@ -124,13 +195,94 @@ def validate_item_structure(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+async def _score_items_concurrently(
+    items: List[Dict[str, Any]],
+    max_concurrency: int = 8,
+    batch_size: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Validate every item and score it with score_items_batch on worker threads.
+    
+    Items are scored batch_size per LLM request, with at most max_concurrency
+    requests in flight. A failed request marks every item in its chunk.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _process(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        validations = [validate_item_structure(item) for item in chunk]
+        async with semaphore:
+            try:
+                qualities = await asyncio.to_thread(score_items_batch, chunk, batch_size)
+                error = None
+            except Exception as e:
+                qualities = [{} for _ in chunk]
+                error = str(e)
+        return [
+            {
+                "item_id": item.get("id", "unknown"),
+                "validation": validation,
+                "quality": quality,
+                "error": error
+            }
+            for item, validation, quality in zip(chunk, validations, qualities)
+        ]
+    
+    chunk_results = await asyncio.gather(*[_process(chunk) for chunk in _chunks(items, max(1, batch_size))])
+    return [result for chunk in chunk_results for result in chunk]
+
+
+@ai_function
+async def score_items_concurrently(
+    items: List[Dict[str, Any]],
+    max_concurrency: int = 8,
+    batch_size: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Validate and score a batch of items concurrently.
+    
+    Items are scored in chunks of batch_size per LLM request, and the chunk
+    requests are overlapped on worker threads instead of running one after
+    another. A semaphore bounds the number of in-flight requests to respect
+    Azure OpenAI rate limits.
+    
+    Args:
+        items: List of item dictionaries
+        max_concurrency: Maximum number of scoring calls in flight (default: 8)
+        batch_size: Maximum number of items scored per LLM request (default: 8)
+    
+    Returns:
+        List (same order as items) of dictionaries with:
+        - item_id: The item's ID
+        - validation: Result of validate_item_structure
+        - quality: Result of score_item (empty dict if scoring failed)
+        - error: Scoring error message, if any
+    """
+    return await _score_items_concurrently(items, max_concurrency=max_concurrency, batch_size=batch_size)
+
+
+def _item_score(item: Dict[str, Any]) -> Any:
+    """Overall score from a flattened quality_score or the nested quality dict."""
+    if "quality_score" in item:
+        return item["quality_score"]
+    return item.get("quality", {}).get("overall_score")
+
+
+def _item_tier(item: Dict[str, Any]) -> str:
+    """Quality tier from a flattened quality_tier or the nested quality dict."""
+    return item.get("quality_tier") or item.get("quality", {}).get("quality_tier", "unknown")
+
+
 @ai_function
-def aggregate_batch_quality(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def aggregate_batch_quality(items: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Aggregate quality statistics for a batch of items.
+    Score any unscored items and aggregate quality statistics for the batch.
+    
+    This is the primary scoring entry point: call it once for the whole batch.
+    Items that already carry a quality score are not re-scored; the rest are
+    validated and scored concurrently.
     
     Args:
-        items: List of items with quality_score and quality_tier fields
+        items: List of items (scored or unscored)
     
     Returns:
         Dictionary with:
@@ -138,25 +290,164 @@ def aggregate_batch_quality(items: List[Dict[str, Any]]) -> Dict[str, Any]:
         - tier_distribution: Dict of counts per tier
         - total_items: int
         - gold_rate: float (percentage)
+        - items: List of per-item results with item_id, quality_score, quality_tier,
+          improvement_suggestions, validation_errors, and error (if scoring failed)
     """
     if not items:
         return {
             "average_score": 0.0,
             "tier_distribution": {},
             "total_items": 0,
-            "gold_rate": 0.0
+            "gold_rate": 0.0,
+            "items": []
         }
     
-    scores = [item.get("quality_score", 0.0) for item in items]
-    tiers = [item.get("quality_tier", "unknown") for item in items]
+    unscored = [item for item in items if _item_score(item) is None]
+    results_by_id = {}
+    if unscored:
+        for item, result in zip(unscored, await _score_items_concurrently(unscored)):
+            quality = result["quality"]
+            item["quality"] = quality
+            item["quality_score"] = quality.get("overall_score", 0.0)
+            item["quality_tier"] = quality.get("quality_tier")
+            results_by_id[id(item)] = result
+        
+        # Derive any tiers the scorer did not return in one vectorized lookup
+        untiered = [item for item in unscored if not item["quality_tier"]]
+        if untiered:
+            fallback_tiers = calculate_quality_tiers(np.array([item["quality_score"] for item in untiered], dtype=np.float64))
+            for item, tier in zip(untiered, fallback_tiers):
+                item["quality_tier"] = tier
     
-    tier_counts = {}
-    for tier in tiers:
-        tier_counts[tier] = tier_counts.get(tier, 0) + 1
+    per_item = []
+    for item in items:
+        result = results_by_id.get(id(item), {})
+        per_item.append({
+            "item_id": item.get("id", "unknown"),
+            "quality_score": _item_score(item) or 0.0,
+            "quality_tier": _item_tier(item),
+            "improvement_suggestions": item.get("quality", {}).get("improvement_suggestions", []),
+            "validation_errors": result.get("validation", {}).get("validation_errors", []),
+            "error": result.get("error")
+        })
+    
+    scores = np.fromiter((entry["quality_score"] for entry in per_item), dtype=np.float64, count=len(per_item))
+    tiers = np.array([entry["quality_tier"] for entry in per_item], dtype=object)
+    unique_tiers, counts = np.unique(tiers.astype(str), return_counts=True)
+    tier_counts = dict(zip(unique_tiers.tolist(), counts.tolist()))
     
     return {
-        "average_score": sum(scores) / len(scores),
+        "average_score": float(scores.mean()),
         "tier_distribution": tier_counts,
         "total_items": len(items),
-        "gold_rate": (tier_counts.get("gold", 0) / len(items)) * 100
+        "gold_rate": (tier_counts.get("gold", 0) / len(items)) * 100,
+        "items": per_item
     }
+
+
+@ai_function
+async def regenerate_failing_items(
+    items: List[Dict[str, Any]],
+    max_attempts: int = 2,
+    max_concurrency: int = 8
+) -> Dict[str, Any]:
+    """
+    Regenerate and re-score every needs_revision item of a scored batch concurrently.
+    
+    A mixed batch would otherwise need two sequential handoffs: passing items to
+    review_coordinator_agent and failing items back to generator_agent. This runs
+    the retry branch for all failing items at once (each one regenerated for its
+    own topic and evidence, then re-scored), so the whole batch can move on to
+    review in a single handoff.
+    
+    A regenerated item is only accepted if it also passes the diversity check
+    against the stimuli of every item already going to review; a similar
+    candidate counts as a failed attempt. Items keep their original batch order.
+    
+    Args:
+        items: Scored items (quality_score or quality.overall_score set)
+        max_attempts: Regeneration attempts per failing item (default: 2)
+        max_concurrency: Maximum number of items regenerating at once (default: 8)
+    
+    Returns:
+        Dictionary with:
+        - passed: Items scoring >= 2.5, including successful regenerations
+        - still_failing: Items that stayed below 2.5 after max_attempts
+        - regenerated_count: int (failing items replaced by a passing regeneration)
+    """
+    min_score = _TIER_THRESHOLDS[0]
+    failing_slots = [i for i, item in enumerate(items) if (_item_score(item) or 0.0) < min_score]
+    failing = set(failing_slots)
+    
+    # Accepted stimuli grow as regenerations pass; the lock serializes check-and-add
+    # so two concurrent candidates cannot both pass against the same snapshot
+    try:
+        accepted_embeddings = await asyncio.to_thread(
+            precompute_stimulus_embeddings,
+            [item.get("stimulus", "") for i, item in enumerate(items) if i not in failing]
+        )
+    except Exception:
+        accepted_embeddings = None
+    accept_lock = asyncio.Lock()
+    
+    async def _accept_if_diverse(candidate: Dict[str, Any]) -> bool:
+        nonlocal accepted_embeddings
+        stimulus = candidate.get("stimulus", "")
+        async with accept_lock:
+            diversity = await asyncio.to_thread(check_diversity_precomputed, stimulus, accepted_embeddings)
+            if not diversity["is_diverse"]:
+                return False
+            candidate["similarity_at_generation"] = diversity["max_similarity"]
+            if stimulus:
+                try:
+                    new_row = await asyncio.to_thread(precompute_stimulus_embeddings, [stimulus])
+                except Exception:
+                    return True
+                if accepted_embeddings is None or not len(accepted_embeddings):
+                    accepted_embeddings = new_row
+                else:
+                    accepted_embeddings = np.vstack([accepted_embeddings, new_row])
+            return True
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _retry(item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    candidate = await asyncio.to_thread(
+                        generate_item_with_context,
+                        topic_code=item.get("topic", ""),
+                        evidence_statements=item.get("evidence_statements", [])
+                    )
+                    if not candidate:
+                        continue
+                    quality = await asyncio.to_thread(score_item, candidate)
+                except Exception:
+                    continue
+                candidate["quality"] = quality
+                candidate["quality_score"] = quality.get("overall_score", 0.0)
+                candidate["quality_tier"] = quality.get("quality_tier") or calculate_quality_tier(candidate["quality_score"])
+                candidate["generation_attempt"] = item.get("generation_attempt", 1) + attempt
+                if candidate["quality_score"] >= min_score and await _accept_if_diverse(candidate):
+                    return candidate
+            return item
+    
+    retried = await asyncio.gather(*[_retry(items[i]) for i in failing_slots])
+    
+    slots = list(items)
+    still_failing = set()
+    regenerated = 0
+    for i, result in zip(failing_slots, retried):
+        if result is items[i]:
+            still_failing.add(i)
+        else:
+            slots[i] = result
+            regenerated += 1
+    
+    return {
+        "passed": [item for i, item in enumerate(slots) if i not in still_failing],
+        "still_failing": [slots[i] for i in failing_slots if i in still_failing],
+        "regenerated_count": regenerated
+    }
+
@@ -0,0 +1,3 @@
+"""
+Workflow orchestration for JD-Next exam generation.
+"""
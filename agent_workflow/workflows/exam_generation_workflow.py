@@ -6,6 +6,8 @@ with human-in-the-loop review via DevUI.
 """
 
 import asyncio
+import os
+import sys
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -14,12 +16,8 @@ from typing import Optional
 from agent_framework import HandoffBuilder, FileCheckpointStorage
 from agent_framework.azure import AzureOpenAIChatClient
 
-import sys
-import os
-
-# Add parent directories to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+# Repository root on sys.path for retrieval.py
+from .. import _bootstrap  # noqa: F401
 
 # Import from retrieval.py (which already loads .env and configures clients)
 from retrieval import (
@@ -28,7 +26,7 @@ from retrieval import (
     AZURE_OPENAI_DEPLOYMENT_NAME
 )
 
-from agents import (
+from ..agents import (
     create_generator_agent,
     create_quality_scorer_agent,
     create_post_processor_agent,
@@ -37,11 +35,91 @@ from agents import (
 )
 
 
+COORDINATOR_INSTRUCTIONS = """You are the Coordinator Agent for exam generation workflow.
+        
+Your role:
+1. Receive generation requests (topic code and count)
+2. Extract the exact topic code and count from user request
+3. Hand off to Generator Agent with clear instructions
+4. Monitor workflow progress
+5. Present final results to user
+
+When a user requests item generation:
+- Parse the request to extract: topic code (e.g., "TP.2") and count (e.g., 3)
+- Hand off to generator_agent with message: "Generate [count] items for topic [topic_code]"
+- Example: "Generate 3 items for topic TP.2"
+- The Generator Agent will use its tools to retrieve evidence and generate items
+- Wait for workflow to complete
+- Present final results to user
+
+CRITICAL: Pass the exact topic code to generator_agent (e.g., "TP.2" not "consideration" or "perpetuities")
+
+You do NOT generate items yourself - you coordinate the workflow."""
+
+# Interned once at import so repeated workflow construction reuses the same string
+COORDINATOR_INSTRUCTIONS = sys.intern(COORDINATOR_INSTRUCTIONS)
+
+REQUEST_TEMPLATE = sys.intern("""Generate {count} JD-Next exam items for:
+Topic: {topic}
+Batch ID: {batch_id}
+
+Requirements:
+- Retrieve rubric and evidence statements automatically for topic {topic}
+- Each item must have stimulus, stem, 4 options (A-D), correct answer, and rationale
+- Check diversity (max similarity 0.75)
+- Score quality across 8 dimensions
+- Upload items for human review with review_status="pending_review"
+- Generate final batch report""")
+
+
 # Checkpoint storage directory
 CHECKPOINT_DIR = Path(__file__).parent / "checkpoints"
 CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _is_user_message(msg) -> bool:
+    """True for user-role messages (ChatMessage objects or plain dicts)."""
+    role = msg.get("role") if isinstance(msg, dict) else getattr(msg, "role", None)
+    return str(getattr(role, "value", role)).lower() == "user"
+
+
+class _BatchReportSeen:
+    """
+    Termination condition that fires once an agent message mentions a batch report.
+    
+    Conversations only grow, so each call lowercases just the messages appended
+    since the previous call and latches once a match is found, instead of
+    re-scanning the tail of the conversation on every event. User messages are
+    skipped: the request itself asks for a "final batch report".
+    
+    >>> from types import SimpleNamespace
+    >>> request = SimpleNamespace(role="user", text=REQUEST_TEMPLATE.format(count=1, topic="TP.2", batch_id="x"))
+    >>> seen = _BatchReportSeen()
+    >>> seen([request])
+    False
+    >>> seen([request, SimpleNamespace(role="assistant", text="Batch Report: 1 item uploaded")])
+    True
+    """
+    
+    def __init__(self):
+        self.done = False
+        self._scanned = 0
+    
+    def __call__(self, conv) -> bool:
+        if len(conv) < self._scanned:
+            # A shorter conversation means a new run; start over
+            self.done = False
+            self._scanned = 0
+        if not self.done:
+            self.done = any(
+                "batch report" in str(msg).lower()
+                for msg in conv[self._scanned:]
+                if not _is_user_message(msg)
+            )
+            self._scanned = len(conv)
+        return self.done
+
+
 def create_exam_generation_workflow(checkpoint_storage: Optional[FileCheckpointStorage] = None):
     """
     Build the HandoffBuilder workflow for exam generation with HITL review.
@@ -67,31 +145,15 @@ def create_exam_generation_workflow(checkpoint_storage: Optional[FileCheckpointS
     # Create coordinator (lightweight orchestration agent)
     coordinator = client.create_agent(
         name="coordinator",
-        instructions="""You are the Coordinator Agent for exam generation workflow.
-        
-Your role:
-1. Receive generation requests (topic code and count)
-2. Extract the exact topic code and count from user request
-3. Hand off to Generator Agent with clear instructions
-4. Monitor workflow progress
-5. Present final results to user
-
-When a user requests item generation:
-- Parse the request to extract: topic code (e.g., "TP.2") and count (e.g., 3)
-- Hand off to generator_agent with message: "Generate [count] items for topic [topic_code]"
-- Example: "Generate 3 items for topic TP.2"
-- The Generator Agent will use its tools to retrieve evidence and generate items
-- Wait for workflow to complete
-- Present final results to user
-
-CRITICAL: Pass the exact topic code to generator_agent (e.g., "TP.2" not "consideration" or "perpetuities")
-
-You do NOT generate items yourself - you coordinate the workflow.""",
+        instructions=COORDINATOR_INSTRUCTIONS,
         model="gpt-4o-mini"
     )
     
     # Build the HandoffBuilder workflow
     if checkpoint_storage is None:
+        # FileCheckpointStorage already writes on an executor thread with an atomic
+        # rename, so checkpoint saves do not block the event loop; pass a custom
+        # storage here to change the backend
         checkpoint_storage = FileCheckpointStorage(storage_path=CHECKPOINT_DIR)
     
     workflow = (
@@ -115,7 +177,7 @@ You do NOT generate items yourself - you coordinate the workflow.""",
         .with_interaction_mode("human_in_loop")  # Enable HITL at review_coordinator
         .with_checkpointing(checkpoint_storage)
         .with_termination_condition(
-            lambda conv: any("batch report" in str(msg).lower() for msg in conv[-5:])
+            _BatchReportSeen()
         )
         .build()
     )
@@ -123,6 +185,49 @@ You do NOT generate items yourself - you coordinate the workflow.""",
     return workflow
 
 
+def install_fast_event_loop() -> Optional[str]:
+    """
+    Switch asyncio to an io_uring (uringcore) or libuv (uvloop) event loop if one is installed.
+    
+    Both are optional; the default asyncio loop is kept when neither is available.
+    Only entry points should call this, since the policy applies process-wide.
+    
+    Returns:
+        Name of the installed loop implementation, or None if unchanged
+    """
+    try:
+        import uringcore
+        asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+        return "uringcore"
+    except ImportError:
+        pass
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    except ImportError:
+        return None
+
+
+def _event_preview(event, verbose: bool = False) -> str:
+    """
+    First 100 characters of an event's text payload, without stringifying the event.
+    
+    str(event) can serialize a whole prompt or item batch only to be truncated,
+    so by default only a text field is sliced; set AM_WF_VERBOSE=1 to fall back
+    to the full representation for events without one.
+    """
+    for attr in ("summary", "text", "data"):
+        value = getattr(event, attr, None)
+        if isinstance(value, str) and value:
+            return value[:100]
+        # Streaming updates carry their text on the data object
+        text = getattr(value, "text", None)
+        if isinstance(text, str) and text:
+            return text[:100]
+    return str(event)[:100] if verbose else ""
+
+
 async def run_workflow_cli(topic: str, count: int = 1):
     """
     Run the workflow from command line (without DevUI).
@@ -134,17 +239,7 @@ async def run_workflow_cli(topic: str, count: int = 1):
     workflow = create_exam_generation_workflow()
     
     batch_id = str(uuid.uuid4())[:8]
-    request_message = f"""Generate {count} JD-Next exam items for:
-Topic: {topic}
-Batch ID: {batch_id}
-
-Requirements:
-- Retrieve rubric and evidence statements automatically for topic {topic}
-- Each item must have stimulus, stem, 4 options (A-D), correct answer, and rationale
-- Check diversity (max similarity 0.75)
-- Score quality across 8 dimensions
-- Upload items for human review with review_status="pending_review"
-- Generate final batch report"""
+    request_message = REQUEST_TEMPLATE.format(count=count, topic=topic, batch_id=batch_id)
     
     print(f"\n{'='*60}")
     print(f"Starting Exam Generation Workflow")
@@ -154,8 +249,9 @@ Requirements:
     print(f"{'='*60}\n")
     
     # Run workflow
+    verbose = os.getenv("AM_WF_VERBOSE") == "1"
     async for event in workflow.run_stream(message=request_message):
-        print(f"[{event.__class__.__name__}] {str(event)[:100]}")
+        print(f"[{type(event).__name__}] {_event_preview(event, verbose)}")
     
     print(f"\n{'='*60}")
     print("Workflow Complete")
@@ -171,6 +267,7 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    install_fast_event_loop()
     asyncio.run(run_workflow_cli(
         topic=args.topic,
         count=args.count
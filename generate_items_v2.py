@@ -19,26 +19,95 @@ Requires:
 """
 
 import argparse
+import contextlib
 import json
 import sys
 import random
 import numpy as np
-from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:
+    import orjson
+    
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    _json_loads = orjson.loads
+    
+    def _json_dumps_indented(value: Any) -> str:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2).decode("utf-8")
+    
+    def _json_dumps_line(value: Any) -> bytes:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS) + b"\n"
+except ImportError:
+    # orjson is optional; stdlib json parses and serializes the same data, just slower
+    _json_loads = json.loads
+    
+    def _json_dumps_indented(value: Any) -> str:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    
+    def _json_dumps_line(value: Any) -> bytes:
+        return (json.dumps(value, ensure_ascii=False) + "\n").encode("utf-8")
+
+try:
+    import simsimd
+except ImportError:
+    # simsimd is optional; similarity falls back to a NumPy matrix-vector product
+    simsimd = None
 
 from retrieval import (
     retrieve_similar_items, 
     client, 
     search_rubric, 
     AZURE_OPENAI_CHAT_MODEL,
-    retrieve_comprehensive_context,
+    SIMILARITY_EMBEDDING_DIMENSIONS,
+    get_cached_comprehensive_context,
+    set_context_disk_cache,
     format_rules_for_prompt,
     retrieve_all_rubric_rules,
     upload_items_batch,
     upload_item_to_index,
-    embed,
+    embed_batch,
 )
 
 
+# ---------------------------------------------------------
+# LLM CALLS
+# ---------------------------------------------------------
+
+def _stream_json_completion(messages: List[Dict[str, str]], temperature: float) -> str:
+    """
+    Run a JSON-mode chat completion as a stream and return the full response text.
+    
+    Chunks are collected as they arrive, so the worker thread holds no more
+    than the text itself, and a response cut off at the token limit is reported
+    rather than surfacing only as a JSON parse error.
+    """
+    stream = client.chat.completions.create(
+        model=AZURE_OPENAI_CHAT_MODEL,
+        messages=messages,
+        temperature=temperature,
+        response_format={"type": "json_object"},  # JSON mode: no markdown fences to strip
+        stream=True,
+    )
+    
+    parts = []
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue  # Azure sends content-filter results as chunks without choices
+        choice = chunk.choices[0]
+        if choice.delta is not None and choice.delta.content:
+            parts.append(choice.delta.content)
+        finish_reason = choice.finish_reason or finish_reason
+    
+    if finish_reason == "length":
+        print("[WARNING] Model response was truncated at the token limit", file=sys.stderr)
+    return "".join(parts)
+
+
 # ---------------------------------------------------------
 # POST-GENERATION PROCESSING (Best Practice)
 # ---------------------------------------------------------
@@ -99,21 +168,24 @@ def validate_and_fix_evidence_statements(
     """
     evidence_statements = item.get("evidence_statements", [])
     fixed = []
+    codes_longest_first = None
     
     for stmt in evidence_statements:
         stmt = stmt.strip()
         # If it's just a code like "2.e", expand it
         if ":" not in stmt:
-            # Try to find matching code
-            matched = False
-            for code, text in evidence_map.items():
-                if stmt == code or stmt.startswith(code):
-                    fixed.append(f"{code}: {text}")
-                    matched = True
-                    break
-            if not matched:
-                # Keep original if no match
-                fixed.append(stmt)
+            # Exact code is a single dict probe; otherwise try prefixes, longest code first
+            if stmt in evidence_map:
+                fixed.append(f"{stmt}: {evidence_map[stmt]}")
+                continue
+            if codes_longest_first is None:
+                codes_longest_first = (
+                    _EVIDENCE_CODES_LONGEST_FIRST if evidence_map is EVIDENCE_MAP
+                    else sorted(evidence_map, key=len, reverse=True)
+                )
+            code = next((code for code in codes_longest_first if stmt.startswith(code)), None)
+            # Keep original if no match
+            fixed.append(f"{code}: {evidence_map[code]}" if code is not None else stmt)
         else:
             fixed.append(stmt)
     
@@ -121,6 +193,26 @@ def validate_and_fix_evidence_statements(
     return item
 
 
+def cached_embed_batch(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts as float32 rows through retrieval.embed_batch, whose content-hash
+    cache (in memory and on disk) means only cache misses reach the embedding API.
+    Vectors are truncated to SIMILARITY_EMBEDDING_DIMENSIONS, since they are only
+    compared with each other for scenario diversity.
+    """
+    return np.asarray(embed_batch(texts, dimensions=SIMILARITY_EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+
+def cached_embed(text: str) -> np.ndarray:
+    """Similarity embedding of one text, cached by content hash."""
+    return cached_embed_batch([text])[0]
+
+
+def _norm(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize a vector (or each row of a matrix); cosine similarity is then a dot product."""
+    return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12)
+
+
 def calculate_scenario_similarity(text1: str, text2: str) -> float:
     """
     Calculate semantic similarity between two scenarios using embeddings.
@@ -130,26 +222,99 @@ def calculate_scenario_similarity(text1: str, text2: str) -> float:
         return 0.0
     
     try:
-        # Truncate to first 200 chars for efficiency
-        emb1 = np.array(embed(text1[:200]))
-        emb2 = np.array(embed(text2[:200]))
+        # Truncate to first 200 chars for efficiency; both texts in one request
+        emb1, emb2 = _norm(cached_embed_batch([text1[:200], text2[:200]]))
         
-        # Cosine similarity
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
-        return float(similarity)
+        # Cosine similarity of unit vectors
+        return float(emb1 @ emb2)
     except Exception as e:
         print(f"[WARNING] Similarity calculation failed: {e}", file=sys.stderr)
         return 0.0
 
 
+def stimulus_embeddings(stimuli: List[str]) -> np.ndarray:
+    """
+    Embed stimuli (first 200 chars) as L2-normalized float32 rows.
+    Cached stimuli are read from disk; the rest are embedded in one request.
+    Cosine similarity between rows is then a plain dot product.
+    """
+    if not stimuli:
+        return np.empty((0, 0), dtype=np.float32)
+    return _norm(cached_embed_batch([text[:200] for text in stimuli]))
+
+
+def max_scenario_similarity(new_embedding: np.ndarray, previous_embeddings: Optional[np.ndarray]) -> float:
+    """
+    Highest cosine similarity between a normalized embedding and normalized rows.
+    
+    Rows are normalized once when stored, so the NumPy path is a raw dot product.
+    """
+    if previous_embeddings is None or len(previous_embeddings) == 0:
+        return 0.0
+    if simsimd is not None:
+        # SIMD cosine kernels over contiguous float32 rows
+        distances = simsimd.cdist(
+            np.ascontiguousarray(new_embedding[None, :], dtype=np.float32),
+            np.ascontiguousarray(previous_embeddings, dtype=np.float32),
+            metric="cosine"
+        )
+        return float(1.0 - np.asarray(distances).min())
+    return float((previous_embeddings @ new_embedding).max())
+
+
+# Random-projection LSH over accepted stimulus embeddings, used once a batch has
+# accepted enough items that a full GEMV per check stops being trivial. It can only
+# reject early: with one 16-bit table and 1-bit probes it finds a neighbour at
+# cosine 0.75-0.9 well under half the time, so accepts always run the exact check
+LSH_BITS = 16
+LSH_MIN_ROWS = 64
+
+
+class _ProjectionLSH:
+    """
+    Sign-of-random-projection hash of unit vectors into LSH_BITS-bit buckets.
+    
+    Vectors at high cosine similarity agree on most projection signs, so
+    candidates are the rows in the query's bucket and in every bucket one bit
+    away. Recall is low near the diversity threshold and an empty or dissimilar
+    candidate set proves nothing, so callers use a similar candidate only to
+    reject and fall back to the exact check otherwise.
+    """
+    
+    def __init__(self, dim: int, bits: int = LSH_BITS, seed: int = 0):
+        self._planes = np.random.default_rng(seed).standard_normal((bits, dim)).astype(np.float32)
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self._flips = [1 << b for b in range(bits)]
+        self._buckets: Dict[int, List[int]] = {}
+    
+    def _signature(self, vector: np.ndarray) -> int:
+        return int(((self._planes @ vector) > 0) @ self._weights)
+    
+    def add(self, row: int, vector: np.ndarray) -> None:
+        self._buckets.setdefault(self._signature(vector), []).append(row)
+    
+    def candidates(self, vector: np.ndarray) -> List[int]:
+        signature = self._signature(vector)
+        rows = list(self._buckets.get(signature, ()))
+        for flip in self._flips:
+            rows.extend(self._buckets.get(signature ^ flip, ()))
+        return rows
+
+
 def check_scenario_diversity(
     new_item: Dict[str, Any],
     previous_items: List[Dict[str, Any]],
-    threshold: float = 0.75
+    threshold: float = 0.75,
+    previous_embeddings: Optional[np.ndarray] = None
 ) -> Tuple[bool, float]:
     """
     Check if new scenario is sufficiently different from previous ones.
     
+    The new stimulus is embedded once and compared to every previous stimulus in
+    a single matrix-vector product. Pass previous_embeddings (rows from
+    stimulus_embeddings, one per previous item with a stimulus) to skip
+    re-embedding the previous items.
+    
     Returns: (is_diverse, max_similarity)
     
     Why semantic check is better than string comparison:
@@ -162,12 +327,15 @@ def check_scenario_diversity(
     if not previous_items or not new_stimulus:
         return True, 0.0
     
-    max_similarity = 0.0
-    for prev_item in previous_items:
-        prev_stimulus = prev_item.get("stimulus", "")
-        if prev_stimulus:
-            similarity = calculate_scenario_similarity(new_stimulus, prev_stimulus)
-            max_similarity = max(max_similarity, similarity)
+    try:
+        if previous_embeddings is None:
+            previous_embeddings = stimulus_embeddings(
+                [prev["stimulus"] for prev in previous_items if prev.get("stimulus")]
+            )
+        max_similarity = max_scenario_similarity(stimulus_embeddings([new_stimulus])[0], previous_embeddings)
+    except Exception as e:
+        print(f"[WARNING] Similarity calculation failed: {e}", file=sys.stderr)
+        max_similarity = 0.0
     
     is_diverse = max_similarity < threshold
     return is_diverse, max_similarity
@@ -177,27 +345,14 @@ def check_scenario_diversity(
 # CORE GENERATION FUNCTION (MULTI-STAGE)
 # ---------------------------------------------------------
 
-def generate_jdnext_item(
-    topic_code: str,
-    evidence_statements: List[str],
-    comprehensive_context: Dict[str, Any],
-    temperature: float = 0.4,
-    validate: bool = True,
-    previous_scenarios: Optional[List[str]] = None,
-) -> Optional[Dict[str, Any]]:
+def render_generation_context(comprehensive_context: Dict[str, Any]) -> Dict[str, str]:
     """
-    Generate a single JD-Next item aligned to a specific topic and evidence statement.
-    Uses FULL rubric rules (all categories) and similar items as context.
-    Implements multi-stage generation: Generate -> Score -> Post-process.
+    Render the prompt sections of a comprehensive context.
     
-    Args:
-        previous_scenarios: Brief descriptions of previously generated scenarios to avoid repetition
-    
-    Returns a dict representing the item, or None if parsing fails.
-    
-    Note: Answer position randomization happens in post-processing via shuffle_answer_options().
+    Returns rubric_context, topic_context, example_context and item_context
+    strings. They depend only on the context, so a batch renders them once and
+    passes them to every generate_jdnext_item call.
     """
-
     # Extract context components
     all_rules = comprehensive_context.get("all_rules", {})
     topic_definition = comprehensive_context.get("topic_definition")
@@ -237,6 +392,49 @@ def generate_jdnext_item(
         )
     item_context = "\n\n".join(item_context_lines) if item_context_lines else "No reference items available."
 
+    return {
+        "rubric_context": rubric_context,
+        "topic_context": topic_context,
+        "example_context": example_context,
+        "item_context": item_context,
+    }
+
+
+def generate_jdnext_item(
+    topic_code: str,
+    evidence_statements: List[str],
+    comprehensive_context: Dict[str, Any],
+    temperature: float = 0.4,
+    validate: bool = True,
+    previous_scenarios: Optional[List[str]] = None,
+    fused_scoring: bool = False,
+    rendered_context: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Generate a single JD-Next item aligned to a specific topic and evidence statement.
+    Uses FULL rubric rules (all categories) and similar items as context.
+    Implements multi-stage generation: Generate -> Score -> Post-process.
+    
+    Args:
+        previous_scenarios: Brief descriptions of previously generated scenarios to avoid repetition
+        fused_scoring: With validate, have the generation call also self-score the item
+            (one request, rubric sent once) instead of a separate Stage 2 call; falls
+            back to Stage 2 if the response carries no usable quality assessment
+        rendered_context: render_generation_context(comprehensive_context), if already computed
+    
+    Returns a dict representing the item, or None if parsing fails.
+    
+    Note: Answer position randomization happens in post-processing via shuffle_answer_options().
+    """
+
+    # Render context strings (pre-rendered once per batch by generate_items_batch)
+    if rendered_context is None:
+        rendered_context = render_generation_context(comprehensive_context)
+    rubric_context = rendered_context["rubric_context"]
+    topic_context = rendered_context["topic_context"]
+    example_context = rendered_context["example_context"]
+    item_context = rendered_context["item_context"]
+
     # System prompt with FULL rubric (rubric-driven, JSON-only)
     system_prompt = f"""You are the JD-Next Item Generator - an expert psychometrician creating high-quality legal exam items.
 
@@ -325,42 +523,156 @@ Generate ONE new item that:
 Output only the JSON. No explanations before or after.
 """.strip()
 
-    # Stage 1: Generate initial item
+    fused = validate and fused_scoring
+    if fused:
+        user_message += f"""
+
+=== SELF-SCORING ===
+After writing the item, score it against the rubric rules above.
+{_SCORING_INSTRUCTIONS}
+
+Instead of the bare item, return ONE JSON object with two keys:
+{{"item": <the item in the format above>, "quality": <the assessment in the format below>}}
+
+Assessment format:
+{_SCORING_SCHEMA}"""
+
+    # Stage 1: Generate initial item (self-scored when fused)
     print("[Stage 1] Generating initial item...")
-    response = client.chat.completions.create(
-        model=AZURE_OPENAI_CHAT_MODEL,
+    content = _stream_json_completion(
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
         ],
         temperature=temperature,
     )
-
-    content = response.choices[0].message.content.strip()
-    
-    # Clean up potential markdown code blocks
-    if content.startswith("```json"):
-        content = content[7:]
-    if content.startswith("```"):
-        content = content[3:]
-    if content.endswith("```"):
-        content = content[:-3]
-    content = content.strip()
     
     try:
-        item = json.loads(content)
+        item = _json_loads(content)
     except Exception as e:
         print("Failed to parse generated item as JSON:", e, file=sys.stderr)
         print("Raw model output:\n", content, file=sys.stderr)
         return None
 
-    # Stage 2: Validate and refine (optional)
+    if fused and isinstance(item, dict) and isinstance(item.get("item"), dict):
+        quality_assessment = item.get("quality")
+        item = item["item"]
+        if isinstance(quality_assessment, dict) and "overall_score" in quality_assessment:
+            item["quality"] = _quality_record(quality_assessment)
+            print(f"[Scoring] Item self-scored: {item['quality']['overall_score']:.2f}/5.0 - Tier: {item['quality']['quality_tier'].upper()}")
+            return item
+
+    # Stage 2: Validate and refine (optional; also the fallback when fused scoring is unusable)
     if validate:
         item = validate_and_refine_item(item, rubric_context, topic_code, evidence_statements)
 
     return item
 
 
+# Shared by the single-item, batched, and fused scoring prompts
+_SCORING_INSTRUCTIONS = """Score each dimension from 1-5:
+- 5 = Excellent, exemplary quality, no issues
+- 4 = Good, minor improvements possible
+- 3 = Acceptable, some issues but usable
+- 2 = Below standard, significant issues
+- 1 = Poor, major violations, needs rewrite
+
+For each dimension, provide:
+1. A numeric score (1-5)
+2. Brief justification (1-2 sentences)
+3. Specific violations or issues found (if any)"""
+
+_SCORING_SCHEMA = """{
+  "scores": {
+    "stimulus": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": ["issue1", "issue2"] or []
+    },
+    "stem": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "key": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "distractors": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "alignment": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "language": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "style": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    },
+    "fairness": {
+      "score": <1-5>,
+      "justification": "...",
+      "issues": []
+    }
+  },
+  "overall_score": <weighted average 1-5>,
+  "quality_tier": "gold|silver|bronze|needs_revision",
+  "summary": "Brief overall assessment",
+  "improvement_suggestions": ["suggestion1", "suggestion2"]
+}"""
+
+
+_OPTION_LETTERS = frozenset("ABCD")
+
+
+def _structural_errors(item: Dict[str, Any]) -> List[str]:
+    """Rule-based problems that make an item unscoreable without asking the LLM."""
+    errors = []
+    options = item.get("options")
+    if not isinstance(options, dict) or set(options) != _OPTION_LETTERS:
+        errors.append("Options must be exactly A, B, C, D")
+    elif item.get("correct_answer") not in options:
+        errors.append(f"Correct answer '{item.get('correct_answer')}' not in options")
+    for field in ("stimulus", "stem", "rationale"):
+        if not item.get(field):
+            errors.append(f"Missing {field}")
+    if "evidence_statements" in item and not isinstance(item["evidence_statements"], list):
+        errors.append("evidence_statements must be a list")
+    return errors
+
+
+def _structural_failure_record(errors: List[str]) -> Dict[str, Any]:
+    """Quality metadata for an item rejected by _structural_errors (no LLM call made)."""
+    return {
+        "overall_score": 0,
+        "quality_tier": "needs_revision",
+        "structural_errors": errors,
+        "scored_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def _quality_record(quality_assessment: Dict[str, Any], scored_at: Optional[str] = None) -> Dict[str, Any]:
+    """Quality metadata stored on an item from a parsed scoring assessment."""
+    return {
+        "scores": quality_assessment.get("scores", {}),
+        "overall_score": quality_assessment.get("overall_score", 0),
+        "quality_tier": quality_assessment.get("quality_tier", "unscored"),
+        "summary": quality_assessment.get("summary", ""),
+        "improvement_suggestions": quality_assessment.get("improvement_suggestions", []),
+        "scored_at": scored_at or __import__("datetime").datetime.utcnow().isoformat() + "Z",
+    }
+
+
 def validate_and_refine_item(
     item: Dict[str, Any],
     rubric_context: str,
@@ -383,7 +695,16 @@ def validate_and_refine_item(
     
     Overall quality_score = weighted average (1-5)
     Quality tier: "gold" (4.5+), "silver" (3.5-4.5), "bronze" (2.5-3.5), "needs_revision" (<2.5)
+    
+    Structurally broken items (see _structural_errors) are marked needs_revision
+    without the scoring call.
     """
+    structural_errors = _structural_errors(item)
+    if structural_errors:
+        print(f"[Stage 2] Skipping scoring, structural errors: {'; '.join(structural_errors)}")
+        item["quality"] = _structural_failure_record(structural_errors)
+        return item
+    
     print("[Stage 2] Scoring item against rubric dimensions...")
     
     scoring_prompt = f"""You are a JD-Next Psychometric Quality Scorer. Score the following exam item against rubric dimensions.
@@ -392,109 +713,33 @@ def validate_and_refine_item(
 {rubric_context}
 
 === ITEM TO SCORE ===
-{json.dumps(item, indent=2)}
+{_json_dumps_indented(item)}
 
 === TARGET ===
 Topic: {topic_code}
 Evidence: {", ".join(evidence_statements)}
 
 === SCORING INSTRUCTIONS ===
-Score each dimension from 1-5:
-- 5 = Excellent, exemplary quality, no issues
-- 4 = Good, minor improvements possible
-- 3 = Acceptable, some issues but usable
-- 2 = Below standard, significant issues
-- 1 = Poor, major violations, needs rewrite
-
-For each dimension, provide:
-1. A numeric score (1-5)
-2. Brief justification (1-2 sentences)
-3. Specific violations or issues found (if any)
+{_SCORING_INSTRUCTIONS}
 
 === OUTPUT FORMAT (JSON only) ===
-{{
-  "scores": {{
-    "stimulus": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": ["issue1", "issue2"] or []
-    }},
-    "stem": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "key": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "distractors": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "alignment": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "language": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "style": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }},
-    "fairness": {{
-      "score": <1-5>,
-      "justification": "...",
-      "issues": []
-    }}
-  }},
-  "overall_score": <weighted average 1-5>,
-  "quality_tier": "gold|silver|bronze|needs_revision",
-  "summary": "Brief overall assessment",
-  "improvement_suggestions": ["suggestion1", "suggestion2"]
-}}
+{_SCORING_SCHEMA}
 
 Output only valid JSON. No markdown code blocks.
 """.strip()
 
-    response = client.chat.completions.create(
-        model=AZURE_OPENAI_CHAT_MODEL,
+    scoring_result = _stream_json_completion(
         messages=[
             {"role": "user", "content": scoring_prompt},
         ],
         temperature=0.2,  # Low temperature for consistent scoring
     )
-
-    scoring_result = response.choices[0].message.content.strip()
-    
-    # Clean up potential markdown
-    if scoring_result.startswith("```json"):
-        scoring_result = scoring_result[7:]
-    if scoring_result.startswith("```"):
-        scoring_result = scoring_result[3:]
-    if scoring_result.endswith("```"):
-        scoring_result = scoring_result[:-3]
-    scoring_result = scoring_result.strip()
     
     try:
-        quality_assessment = json.loads(scoring_result)
+        quality_assessment = _json_loads(scoring_result)
         
         # Add quality metadata to the item
-        item["quality"] = {
-            "scores": quality_assessment.get("scores", {}),
-            "overall_score": quality_assessment.get("overall_score", 0),
-            "quality_tier": quality_assessment.get("quality_tier", "unscored"),
-            "summary": quality_assessment.get("summary", ""),
-            "improvement_suggestions": quality_assessment.get("improvement_suggestions", []),
-            "scored_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
-        }
+        item["quality"] = _quality_record(quality_assessment)
         
         tier = item["quality"]["quality_tier"]
         score = item["quality"]["overall_score"]
@@ -522,21 +767,149 @@ Output only valid JSON. No markdown code blocks.
     return item
 
 
+def validate_and_refine_items(
+    items: List[Dict[str, Any]],
+    rubric_context: str,
+) -> List[Dict[str, Any]]:
+    """
+    Stage 2 for several items at once: score them all in a single LLM request.
+    
+    Uses the same dimensions and output schema as validate_and_refine_item, with
+    each item's own topic and evidence statements. A single item, or a response
+    that does not parse into one assessment per item, falls back to scoring each
+    item individually with validate_and_refine_item.
+    
+    Returns the items (same order) with quality scores attached.
+    """
+    # Structurally broken items are marked needs_revision and left out of the request
+    scoreable = []
+    for item in items:
+        structural_errors = _structural_errors(item)
+        if structural_errors:
+            item["quality"] = _structural_failure_record(structural_errors)
+        else:
+            scoreable.append(item)
+    if len(scoreable) < len(items):
+        validate_and_refine_items(scoreable, rubric_context)
+        return items
+    
+    if len(items) <= 1:
+        return [
+            validate_and_refine_item(
+                item=item,
+                rubric_context=rubric_context,
+                topic_code=item.get("topic", ""),
+                evidence_statements=item.get("evidence_statements", []),
+            )
+            for item in items
+        ]
+    
+    print(f"[Stage 2] Scoring {len(items)} items against rubric dimensions in one request...")
+    
+    item_sections = "\n\n".join(
+        f"""--- ITEM {n} ---
+Topic: {item.get("topic", "")}
+Evidence: {", ".join(item.get("evidence_statements", []))}
+{_json_dumps_indented(item)}"""
+        for n, item in enumerate(items, start=1)
+    )
+    
+    scoring_prompt = f"""You are a JD-Next Psychometric Quality Scorer. Score each of the following {len(items)} exam items against rubric dimensions.
+
+=== RUBRIC RULES ===
+{rubric_context}
+
+=== ITEMS TO SCORE ===
+{item_sections}
+
+=== SCORING INSTRUCTIONS ===
+Score every item independently, against its own topic and evidence.
+{_SCORING_INSTRUCTIONS}
+
+=== OUTPUT FORMAT (JSON only) ===
+A JSON object {{"assessments": [...]}} whose array holds exactly {len(items)} objects, one per item in the order given, each of the form:
+{_SCORING_SCHEMA}
+
+Output only valid JSON. No markdown code blocks.
+""".strip()
+
+    scoring_result = _stream_json_completion(
+        messages=[
+            {"role": "user", "content": scoring_prompt},
+        ],
+        temperature=0.2,  # Low temperature for consistent scoring
+    )
+    
+    try:
+        assessments = _json_loads(scoring_result).get("assessments")
+        if not isinstance(assessments, list) or len(assessments) != len(items):
+            raise ValueError(f"expected {len(items)} assessments, got {len(assessments) if isinstance(assessments, list) else type(assessments).__name__}")
+    except Exception as e:
+        print(f"[Scoring] Batched scoring response unusable ({e}); scoring items individually", file=sys.stderr)
+        return [validate_and_refine_items([item], rubric_context)[0] for item in items]
+    
+    scored_at = __import__("datetime").datetime.utcnow().isoformat() + "Z"
+    for item, quality_assessment in zip(items, assessments):
+        item["quality"] = _quality_record(quality_assessment, scored_at)
+        print(f"[Scoring] Item scored: {item['quality']['overall_score']:.2f}/5.0 - Tier: {item['quality']['quality_tier'].upper()}")
+    
+    return items
+
+
 # ---------------------------------------------------------
 # BATCH GENERATION
 # ---------------------------------------------------------
 
+def _generate_candidate(
+    topic_code: str,
+    evidence_statements: List[str],
+    comprehensive_context: Dict[str, Any],
+    temperature: float,
+    validate: bool,
+    previous_scenarios: Optional[List[str]],
+    fused_scoring: bool = False,
+    rendered_context: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Generate (and optionally score) one item and apply post-processing; None if parsing fails."""
+    item = generate_jdnext_item(
+        topic_code=topic_code,
+        evidence_statements=evidence_statements,
+        comprehensive_context=comprehensive_context,
+        temperature=temperature,
+        validate=validate,
+        previous_scenarios=previous_scenarios,
+        fused_scoring=fused_scoring,
+        rendered_context=rendered_context,
+    )
+    if item is None:
+        return None
+    
+    # Post-processing: Fix evidence statements
+    item = validate_and_fix_evidence_statements(item, EVIDENCE_MAP)
+    
+    # Post-processing: Shuffle answer positions (truly random)
+    return shuffle_answer_options(item)
+
+
 def generate_items_batch(
     topic_code: str,
     count: int,
     retrieval_k: int = 8,
     temperature: float = 0.4,
     validate: bool = True,
+    max_workers: int = 8,
+    fused_scoring: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Generate multiple JD-Next items for a given topic.
     Uses comprehensive retrieval to get ALL rubric rules plus semantic examples.
     
+    Items are generated (and scored) concurrently, up to max_workers at a time.
+    Each round's candidates are then checked for scenario diversity in order;
+    only rejected or failed items are regenerated in the next round, with the
+    accepted scenarios passed as context. fused_scoring is passed through to
+    generate_jdnext_item.
+    
     Returns a list of item dicts (only those successfully parsed).
     """
 
@@ -545,88 +918,150 @@ def generate_items_batch(
 
     # Get comprehensive context (ALL rules + semantic examples + similar items)
     print(f"[INFO] Retrieving comprehensive context for topic {topic_code}...")
-    comprehensive_context = retrieve_comprehensive_context(
+    comprehensive_context = get_cached_comprehensive_context(
         topic_code=topic_code,
         query_text=query_text,
         k_examples=5,
         k_items=retrieval_k
     )
-
-    items: List[Dict[str, Any]] = []
-    previous_items: List[Dict[str, Any]] = []  # Track full items for semantic diversity
+    
+    # Prompt sections are the same for every item in the batch
+    rendered_context = render_generation_context(comprehensive_context)
+    
+    # Each slot draws its own random evidence statements (kept across its retries),
+    # so the batch spreads over the topic's evidence like sequential generation did
+    evidence_by_slot = [get_evidence_statements_for_topic(topic_code) for _ in range(count)]
+
+    # One slot per requested item, filled in place on accept (None = not accepted)
+    items: List[Optional[Dict[str, Any]]] = [None] * count
+    # Stimuli of the last 3 accepted items, passed to the prompt as scenarios to avoid
+    recent_stimuli: deque = deque(maxlen=3)
+    # Normalized float32 stimulus embeddings of accepted items, kept apart from the
+    # item dicts in one preallocated (count x dim) buffer filled a row per accept, so
+    # each diversity check needs only the new stimulus (embedded with the rest of its
+    # round) and one GEMV over a contiguous view of the filled rows
+    embedding_buffer: Optional[np.ndarray] = None
+    previous_embeddings: Optional[np.ndarray] = None  # embedding_buffer[:rows filled]
+    previous_sum: Optional[np.ndarray] = None  # Running sum of those rows (n * centroid)
+    lsh: Optional[_ProjectionLSH] = None  # Bucket index over those rows, built at LSH_MIN_ROWS
     
     # Generate unique batch ID for this generation session
     import uuid
     generation_batch_id = str(uuid.uuid4())
 
-    for i in range(count):
-        print(f"\n{'='*50}")
-        print(f"Generating item {i + 1}/{count} for topic {topic_code}...")
-        print(f"{'='*50}")
-
-        evidence_statements = get_evidence_statements_for_topic(topic_code)
-        
-        # Build previous scenarios list (first 150 chars for context)
-        previous_scenarios = [
-            prev.get("stimulus", "")[:150] + "..."
-            for prev in previous_items[-3:]  # Only last 3 for token efficiency
-            if prev.get("stimulus")
-        ] if previous_items else None
-        
-        # Retry logic for diversity enforcement (max 2 retries = 3 total attempts)
-        MAX_RETRIES = 2
+    # Retry logic for diversity enforcement (max 2 retries = 3 total attempts)
+    MAX_RETRIES = 2
+    pending = list(range(count))
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, count))) as pool:
         for attempt in range(MAX_RETRIES + 1):
-            if attempt > 0:
-                print(f"[RETRY] Attempt {attempt + 1}/{MAX_RETRIES + 1} due to scenario similarity...")
-
-            item = generate_jdnext_item(
-                topic_code=topic_code,
-                evidence_statements=evidence_statements,
-                comprehensive_context=comprehensive_context,
-                temperature=temperature,
-                validate=validate,
-                previous_scenarios=previous_scenarios,
-            )
+            if not pending:
+                break
             
-            if item is None:
-                print(f"[FAILED] Item {i + 1} failed to parse on attempt {attempt + 1}.", file=sys.stderr)
-                if attempt == MAX_RETRIES:
-                    print(f"[SKIP] Skipping item {i + 1} after {MAX_RETRIES + 1} failed attempts.")
-                    break
-                continue
+            print(f"\n{'='*50}")
+            if attempt == 0:
+                print(f"Generating {count} items for topic {topic_code}...")
+            else:
+                print(f"[RETRY] Attempt {attempt + 1}/{MAX_RETRIES + 1} for {len(pending)} item(s) due to scenario similarity or parse failure...")
+            print(f"{'='*50}")
             
-            # Post-processing: Fix evidence statements
-            item = validate_and_fix_evidence_statements(item, EVIDENCE_MAP)
+            # Build previous scenarios list (first 150 chars for context)
+            previous_scenarios = [
+                stimulus[:150] + "..."
+                for stimulus in recent_stimuli  # Only last 3 for token efficiency
+            ] or None
             
-            # Post-processing: Shuffle answer positions (truly random)
-            original_answer = item.get("correct_answer", "?")
-            item = shuffle_answer_options(item)
-            new_answer = item.get("correct_answer", "?")
+            candidates = list(pool.map(
+                lambda i: _generate_candidate(
+                    topic_code, evidence_by_slot[i], comprehensive_context,
+                    temperature, validate, previous_scenarios, fused_scoring,
+                    rendered_context
+                ),
+                pending
+            ))
             
-            # Check scenario diversity - ENFORCE with retry
-            max_similarity = 0.0
-            is_diverse = True
-            if previous_items:
-                is_diverse, max_similarity = check_scenario_diversity(item, previous_items, threshold=0.75)
-                
-                if not is_diverse and attempt < MAX_RETRIES:
-                    print(f"[REJECT] Scenario similarity: {max_similarity:.3f} (threshold: 0.75) - retrying...")
-                    continue  # Retry with new generation
-                elif not is_diverse and attempt == MAX_RETRIES:
-                    print(f"[WARNING] Scenario similarity: {max_similarity:.3f} after {MAX_RETRIES + 1} attempts - accepting anyway.")
+            # Embed every candidate stimulus of the round in one request rather than
+            # one request per item; cached stimuli are read from disk
+            round_embeddings: Dict[int, np.ndarray] = {}
+            with_stimulus = [k for k, item in enumerate(candidates) if item is not None and item.get("stimulus")]
+            if with_stimulus:
+                try:
+                    rows = stimulus_embeddings([candidates[k]["stimulus"] for k in with_stimulus])
+                    round_embeddings = dict(zip(with_stimulus, rows))
+                except Exception as e:
+                    print(f"[WARNING] Similarity calculation failed: {e}", file=sys.stderr)
             
-            # Add generation metadata for tracking
-            item["generation_batch_id"] = generation_batch_id
-            item["generation_attempt"] = attempt + 1
-            item["similarity_at_generation"] = max_similarity
+            retry = []
+            for k, (i, item) in enumerate(zip(pending, candidates)):
+                if item is None:
+                    print(f"[FAILED] Item {i + 1} failed to parse on attempt {attempt + 1}.", file=sys.stderr)
+                    if attempt == MAX_RETRIES:
+                        print(f"[SKIP] Skipping item {i + 1} after {MAX_RETRIES + 1} failed attempts.")
+                    else:
+                        retry.append(i)
+                    continue
+                
+                # Check scenario diversity - ENFORCE with retry
+                max_similarity = 0.0
+                is_diverse = True
+                new_embedding = round_embeddings.get(k)
+                if previous_embeddings is not None and new_embedding is not None:
+                    # Mean similarity to the accepted set is one dot product with the running
+                    # centroid, and the max is never below the mean, so a mean over the threshold
+                    # rejects without the pairwise pass (exact max kept for the final attempt,
+                    # whose similarity is recorded)
+                    mean_similarity = float(new_embedding @ previous_sum) / len(previous_embeddings)
+                    bucket_similarity = 0.0
+                    if lsh is not None and attempt < MAX_RETRIES and mean_similarity < 0.75:
+                        # Large batches: a near-duplicate among the LSH bucket candidates
+                        # rejects without the full pass
+                        rows = lsh.candidates(new_embedding)
+                        if rows:
+                            bucket_similarity = max_scenario_similarity(new_embedding, previous_embeddings[rows])
+                    if mean_similarity >= 0.75 and attempt < MAX_RETRIES:
+                        max_similarity = mean_similarity
+                    elif bucket_similarity >= 0.75:
+                        max_similarity = bucket_similarity
+                    else:
+                        # The LSH misses many true neighbours, so accepts are always decided
+                        # by the exact pass over every accepted row
+                        max_similarity = max_scenario_similarity(new_embedding, previous_embeddings)
+                    is_diverse = max_similarity < 0.75
+                    
+                    if not is_diverse and attempt < MAX_RETRIES:
+                        print(f"[REJECT] Item {i + 1} scenario similarity: {max_similarity:.3f} (threshold: 0.75) - retrying...")
+                        retry.append(i)
+                        continue  # Retry with new generation
+                    elif not is_diverse and attempt == MAX_RETRIES:
+                        print(f"[WARNING] Item {i + 1} scenario similarity: {max_similarity:.3f} after {MAX_RETRIES + 1} attempts - accepting anyway.")
+                
+                # Add generation metadata for tracking
+                item["generation_batch_id"] = generation_batch_id
+                item["generation_attempt"] = attempt + 1
+                item["similarity_at_generation"] = max_similarity
+                
+                # Success - add to collection
+                items[i] = item
+                if item.get("stimulus"):
+                    recent_stimuli.append(item["stimulus"])
+                if new_embedding is not None:
+                    if embedding_buffer is None:
+                        embedding_buffer = np.empty((count, new_embedding.shape[0]), dtype=np.float32)
+                    filled = 0 if previous_embeddings is None else len(previous_embeddings)
+                    embedding_buffer[filled] = new_embedding
+                    previous_embeddings = embedding_buffer[:filled + 1]
+                    previous_sum = new_embedding.copy() if previous_sum is None else previous_sum + new_embedding
+                    if lsh is not None:
+                        lsh.add(filled, new_embedding)
+                    elif filled + 1 >= LSH_MIN_ROWS:
+                        lsh = _ProjectionLSH(new_embedding.shape[0])
+                        for row, vector in enumerate(previous_embeddings):
+                            lsh.add(row, vector)
+                print(f"[SUCCESS] Item {i + 1} generated (attempt {attempt + 1}, similarity: {max_similarity:.3f}).")
             
-            # Success - add to collection
-            items.append(item)
-            previous_items.append(item)
-            print(f"[SUCCESS] Item {i + 1} generated (attempt {attempt + 1}, similarity: {max_similarity:.3f}).")
-            break  # Exit retry loop
+            pending = retry
 
-    return items
+    return [item for item in items if item is not None]
 
 
 # ---------------------------------------------------------
@@ -659,6 +1094,9 @@ EVIDENCE_MAP = {
     "9.b": "Identify the elements required for promissory estoppel.",
 }
 
+# Codes ordered longest first, so prefix matching prefers the most specific code
+_EVIDENCE_CODES_LONGEST_FIRST = sorted(EVIDENCE_MAP, key=len, reverse=True)
+
 
 def get_evidence_statements_for_topic(topic_code: str) -> List[str]:
     """
@@ -685,9 +1123,15 @@ def load_valid_topics():
     return {r["subsection"] for r in results}
 
 
+@lru_cache(maxsize=1)
+def _cached_valid_topics() -> frozenset:
+    """Valid topic codes, loaded from the rubric index once per process."""
+    return frozenset(load_valid_topics())
+
+
 def validate_topic(topic_code: str):
     """Validate that the topic code exists in the rubric."""
-    valid_topics = load_valid_topics()
+    valid_topics = _cached_valid_topics()
     if topic_code not in valid_topics:
         raise ValueError(
             f"Unknown topic code '{topic_code}'. "
@@ -732,11 +1176,27 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=8,
         help="Number of similar items to retrieve (default: 8)",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Maximum number of items generated concurrently (default: 8)",
+    )
+    parser.add_argument(
+        "--no-context-cache",
+        action="store_true",
+        help="Re-fetch rubric/example context instead of reusing the on-disk cache",
+    )
     parser.add_argument(
         "--no-score",
         action="store_true",
         help="Skip the scoring stage (faster but no quality metadata)",
     )
+    parser.add_argument(
+        "--fused-scoring",
+        action="store_true",
+        help="Score each item in the same LLM call that generates it (one request instead of two)",
+    )
     parser.add_argument(
         "--upload",
         action="store_true",
@@ -758,9 +1218,69 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
+# Minimum overall score per --upload-quality-threshold tier (read-only view)
+_UPLOAD_TIER_THRESHOLDS = MappingProxyType({
+    "gold": 4.5,
+    "silver": 3.5,
+    "bronze": 2.5,
+    "all": 0.0,
+})
+
+# Shared stand-in for a missing quality record, so per-item lookups on unscored
+# items do not allocate a fresh empty dict
+_NO_QUALITY: Mapping[str, Any] = MappingProxyType({})
+
+# Items per upload_items_batch call, so large runs are submitted in bounded chunks
+_UPLOAD_CHUNK_SIZE = 500
+
+
+def _upload_in_chunks(
+    items: List[Dict[str, Any]],
+    review_status: str,
+    chunk_size: int = _UPLOAD_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    upload_items_batch over fixed-size chunks, merged into one summary.
+    
+    Each chunk is uploaded concurrently by upload_items_batch; chunking bounds
+    the requests in flight and reports progress on large runs.
+    """
+    merged: Dict[str, Any] = {"total": 0, "succeeded": 0, "failed": 0, "by_tier": Counter(), "results": [], "failures": []}
+    for start in range(0, len(items), chunk_size):
+        result = upload_items_batch(items[start:start + chunk_size], review_status=review_status)
+        for key in ("total", "succeeded", "failed"):
+            merged[key] += result[key]
+        merged["by_tier"].update(result["by_tier"])
+        merged["results"].extend(result["results"])
+        merged["failures"].extend(result.get("failures", ()))
+        if len(items) > chunk_size:
+            print(f"[UPLOAD] {merged['total']}/{len(items)} items submitted")
+    merged["by_tier"] = dict(merged["by_tier"])
+    return merged
+
+
+# Below this many items the upload score filter stays a plain comprehension;
+# NumPy's per-call overhead only pays off on larger batches
+_VECTORIZED_FILTER_MIN_ITEMS = 256
+
+# Items serialized per write() when saving JSONL output
+_JSONL_WRITE_CHUNK = 1000
+
+
 def main(argv: Optional[List[str]] = None) -> None:
     args = parse_args(argv)
+    if args.output or sys.stdout.isatty():
+        _run(args, sys.stdout)
+    else:
+        # Items go to stdout as JSONL, so progress messages are sent to stderr
+        # to keep the piped output parseable
+        stdout = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            _run(args, stdout)
+
 
+def _run(args: argparse.Namespace, stdout) -> None:
+    """Generate, report, upload, and write items; stdout receives the item dump."""
     topic_code = args.topic
     count = args.count
     temperature = args.temperature
@@ -772,6 +1292,8 @@ def main(argv: Optional[List[str]] = None) -> None:
     upload_quality_threshold = args.upload_quality_threshold
 
     validate_topic(topic_code)
+    if args.no_context_cache:
+        set_context_disk_cache(False)
 
     print(f"\n{'='*60}")
     print(f"JD-Next Item Generator v2 (Full Rubric Context)")
@@ -792,6 +1314,8 @@ def main(argv: Optional[List[str]] = None) -> None:
         retrieval_k=retrieval_k,
         temperature=temperature,
         validate=score,  # 'validate' param now means 'score'
+        max_workers=args.max_workers,
+        fused_scoring=args.fused_scoring,
     )
 
     print(f"\n{'='*60}")
@@ -801,7 +1325,7 @@ def main(argv: Optional[List[str]] = None) -> None:
     if score:
         tier_counts = {}
         for item in items:
-            tier = item.get("quality", {}).get("quality_tier", "unscored")
+            tier = (item.get("quality") or _NO_QUALITY).get("quality_tier", "unscored")
             tier_counts[tier] = tier_counts.get(tier, 0) + 1
         print(f"Quality Distribution: {tier_counts}")
     
@@ -820,36 +1344,39 @@ def main(argv: Optional[List[str]] = None) -> None:
         print(f"Uploading items to exam index with status 'pending_review'...")
         print(f"{'='*60}")
         
-        # Define tier thresholds
-        tier_thresholds = {
-            "gold": 4.5,
-            "silver": 3.5,
-            "bronze": 2.5,
-            "all": 0.0,
-        }
-        
-        # Filter by quality tier threshold
-        min_score_threshold = tier_thresholds.get(upload_quality_threshold, 2.5)
-        items_to_upload = items
-        
+        # Resolve the effective score threshold once, then filter in a single pass
         if upload_min_score > 0:
             # Use explicit min score if provided (overrides tier threshold)
-            items_to_upload = [
-                item for item in items 
-                if item.get("quality", {}).get("overall_score", 0) >= upload_min_score
-            ]
-            print(f"Filtered to {len(items_to_upload)} items with score >= {upload_min_score}")
+            threshold = upload_min_score
+            filter_desc = f"score >= {upload_min_score}"
         elif upload_quality_threshold != "all":
             # Use tier-based threshold
+            threshold = _UPLOAD_TIER_THRESHOLDS.get(upload_quality_threshold, 2.5)
+            filter_desc = f"quality tier >= {upload_quality_threshold} (score >= {threshold})"
+        else:
+            threshold = None
+            filter_desc = "no quality threshold"
+        
+        if threshold is None:
+            items_to_upload = items
+        elif len(items) >= _VECTORIZED_FILTER_MIN_ITEMS:
+            # Large batches: extract scores once and compare them in one vectorized pass
+            scores = np.fromiter(
+                ((item.get("quality") or _NO_QUALITY).get("overall_score", 0) for item in items),
+                dtype=np.float64, count=len(items)  # float64 so scores equal to the threshold still pass
+            )
+            items_to_upload = [items[i] for i in np.flatnonzero(scores >= threshold).tolist()]
+        else:
             items_to_upload = [
-                item for item in items 
-                if item.get("quality", {}).get("overall_score", 0) >= min_score_threshold
+                item for item in items
+                if (item.get("quality") or _NO_QUALITY).get("overall_score", 0) >= threshold
             ]
-            print(f"Filtered to {len(items_to_upload)} items with quality tier >= {upload_quality_threshold} (score >= {min_score_threshold})")
+        if threshold is not None:
+            print(f"Filtered to {len(items_to_upload)} items with {filter_desc}")
         
         if items_to_upload:
             # Upload with pending_review status for human review
-            upload_result = upload_items_batch(items_to_upload, review_status="pending_review")
+            upload_result = _upload_in_chunks(items_to_upload, review_status="pending_review")
             print(f"Upload Results:")
             print(f"  - Total: {upload_result['total']}")
             print(f"  - Succeeded: {upload_result['succeeded']}")
@@ -857,26 +1384,33 @@ def main(argv: Optional[List[str]] = None) -> None:
             print(f"  - By Tier: {upload_result['by_tier']}")
             print(f"  - Review Status: pending_review (awaiting human review)")
             
-            # Show any errors
-            for r in upload_result['results']:
-                if not r['success']:
-                    print(f"  - Error uploading {r['id']}: {r['error']}")
+            # Show any errors (failures is empty when every upload succeeded)
+            for r in upload_result.get('failures', ()):
+                print(f"  - Error uploading {r['id']}: {r['error']}")
         else:
-            threshold_desc = f"{upload_quality_threshold} tier" if upload_quality_threshold != "all" else f"score >= {upload_min_score}"
-            print(f"No items met the threshold ({threshold_desc})")
+            print(f"No items met the threshold ({filter_desc})")
 
     # Write to file if requested
     if output_path:
-        with open(output_path, "w", encoding="utf-8") as f:
-            for item in items:
-                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        # 1 MiB buffer, filled a chunk of serialized lines per write() call
+        with open(output_path, "wb", buffering=1 << 20) as f:
+            for start in range(0, len(items), _JSONL_WRITE_CHUNK):
+                f.write(b"".join(map(_json_dumps_line, items[start:start + _JSONL_WRITE_CHUNK])))
         print(f"\nWrote items to {output_path}")
     else:
-        # Print to stdout as JSONL
-        print("\n=== GENERATED ITEMS ===")
-        for item in items:
-            print(json.dumps(item, indent=2, ensure_ascii=False))
-            print()
+        # Print to stdout: indented under a banner for a terminal, bare JSONL when piped
+        if stdout.isatty():
+            # One write for the whole dump instead of two print() calls per item;
+            # the serializer is bound to a local so the loop skips the global lookup
+            dumps = _json_dumps_indented
+            stdout.write("\n=== GENERATED ITEMS ===\n")
+            stdout.write("".join(f"{dumps(item)}\n\n" for item in items))
+            stdout.flush()
+        else:
+            # Same bytes as the --output file, written below the text layer
+            stdout.flush()
+            stdout.buffer.write(b"".join(map(_json_dumps_line, items)))
+            stdout.buffer.flush()
 
 
 if __name__ == "__main__":
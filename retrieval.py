@@ -9,12 +9,38 @@ Handles:
 """
 
 import os
-from typing import Any, Dict, List, Optional
+import json
+import hashlib
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from requests import Session
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
-from azure.search.documents.models import VectorizedQuery
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import RequestsTransport
+import httpx
+import numpy as np
+from openai import AzureOpenAI, DefaultHttpxClient
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
+
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(value: Any) -> str:
+        # Accept what json.dumps accepts here: non-str keys and NumPy scalars
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+except ImportError:
+    # orjson is optional; stdlib json produces equivalent (if less compact) JSON
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 
 
 # ---------------------------------------------------------
@@ -27,6 +53,8 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 AZURE_OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+# Truncated (MRL) embedding size for stimulus similarity checks; index vectors stay full size
+SIMILARITY_EMBEDDING_DIMENSIONS = 256
 AZURE_OPENAI_CHAT_MODEL = "gpt-4o"
 
 AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
@@ -51,27 +79,116 @@ EXAMPLE_CATEGORIES = [
     "BEFORE_AFTER",
 ]
 
+# Category filters built once; search.in is evaluated as a single set lookup
+# instead of an OR chain of equality comparisons
+_MANDATORY_FILTER = f"search.in(category, '{','.join(MANDATORY_RULE_CATEGORIES)}', ',')"
+_EXAMPLE_FILTER = f"search.in(category, '{','.join(EXAMPLE_CATEGORIES)}', ',')"
+
+# Fields selected from rubric chunks (rules and examples)
+_RUBRIC_FIELDS = ("id", "category", "subsection", "type", "content", "order")
+_TOPIC_FIELDS = ("id", "category", "subsection", "type", "content")
+
+
+# Azure Search connection pool size and retry policy for throttled requests
+# (503 when the service is over its provisioned capacity, 429 when rate limited)
+SEARCH_POOL_MAXSIZE = 32
+SEARCH_RETRY_POLICY = {
+    "retry_total": 5,
+    "retry_backoff_factor": 1.5,
+    "retry_on_status_codes": [429, 503],
+}
+# Seconds to establish a Search connection and to wait for a response; azure-core
+# defaults both to 300, which leaves a stalled keep-alive connection hanging a tool call
+SEARCH_CONNECTION_TIMEOUT = 10
+SEARCH_READ_TIMEOUT = 60
+
+# Concurrent embedding/search calls issued by retrieve_dual and retrieve_comprehensive_context
+RETRIEVAL_MAX_WORKERS = 8
+
+# Item texts embedded per request in upload_items_batch (Azure OpenAI allows up to 2048)
+EMBED_BATCH_SIZE = 256
+
+# Documents per upload_documents request in upload_items_batch; Azure Search caps a
+# request at 1000 documents and 16 MB, and each document carries a full vector
+UPLOAD_BATCH_SIZE = 100
+# Resubmissions of documents throttled (429/503) inside a partially successful request
+UPLOAD_DOCUMENT_RETRIES = 3
+
+# Concurrent indexing requests in upload_items_batch; kept within the Search pool size
+UPLOAD_MAX_WORKERS = SEARCH_POOL_MAXSIZE
+
+# Azure OpenAI connection pool: generation, scoring, and embedding calls from
+# worker threads share these keep-alive connections instead of new TLS handshakes
+OPENAI_POOL_KEEPALIVE = 32
+OPENAI_POOL_MAXSIZE = 64
+
+try:
+    import h2  # noqa: F401  (optional: enables HTTP/2 multiplexing in httpx)
+    _OPENAI_HTTP2 = True
+except ImportError:
+    _OPENAI_HTTP2 = False
+
 
 # ---------------------------------------------------------
 # CLIENTS
 # ---------------------------------------------------------
 
+# One pooled HTTP session shared by every Azure Search client, so concurrent
+# tool calls reuse up to SEARCH_POOL_MAXSIZE keep-alive connections
+_search_session = Session()
+_search_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SEARCH_POOL_MAXSIZE)
+_search_session.mount("https://", _search_adapter)
+_search_session.mount("http://", _search_adapter)
+
+
+# Worker threads for fanning out independent embedding/search calls within one
+# retrieval (tasks never wait on other tasks in this pool, so it cannot deadlock)
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval")
+
+
+def _search_client_options() -> Dict[str, Any]:
+    """Transport and retry keyword arguments for an Azure Search client."""
+    # Each client gets its own transport over the shared session; session_owner=False
+    # keeps a client that is closed from closing the pool
+    return {
+        "transport": RequestsTransport(
+            session=_search_session,
+            session_owner=False,
+            connection_timeout=SEARCH_CONNECTION_TIMEOUT,
+            read_timeout=SEARCH_READ_TIMEOUT
+        ),
+        **SEARCH_RETRY_POLICY,
+    }
+
+
 search_rubric = SearchClient(
     endpoint=AZURE_SEARCH_ENDPOINT,
     index_name=AZURE_RUBRIC_INDEX,
-    credential=AzureKeyCredential(AZURE_SEARCH_KEY)
+    credential=AzureKeyCredential(AZURE_SEARCH_KEY),
+    **_search_client_options()
 )
 
 search_items = SearchClient(
     endpoint=AZURE_SEARCH_ENDPOINT,
     index_name=AZURE_EXAM_INDEX,
-    credential=AzureKeyCredential(AZURE_SEARCH_KEY)
+    credential=AzureKeyCredential(AZURE_SEARCH_KEY),
+    **_search_client_options()
+)
+
+# DefaultHttpxClient keeps the SDK's timeout and redirect defaults
+_openai_http_client = DefaultHttpxClient(
+    http2=_OPENAI_HTTP2,
+    limits=httpx.Limits(
+        max_keepalive_connections=OPENAI_POOL_KEEPALIVE,
+        max_connections=OPENAI_POOL_MAXSIZE
+    )
 )
 
 client = AzureOpenAI(
     api_key=AZURE_OPENAI_KEY,
     api_version="2024-02-01",
-    azure_endpoint=AZURE_OPENAI_ENDPOINT
+    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+    http_client=_openai_http_client
 )
 
 
@@ -79,33 +196,218 @@ client = AzureOpenAI(
 # EMBEDDING FUNCTION
 # ---------------------------------------------------------
 
+# Embeddings cached by content hash: an in-process LRU in front of one JSON file
+# per (model, dimensions, text) on disk, so unchanged queries, item texts, and
+# stimuli are not re-embedded across calls or runs. This is the only embedding
+# cache; generate_items_v2 and generation_tools go through embed_batch.
+EMBEDDING_CACHE_DIR = os.path.expanduser(os.getenv("EMBEDDING_CACHE_DIR", "~/.cache/aspenmind/embeddings"))
+EMBEDDING_DISK_CACHE_ENABLED = os.getenv("EMBEDDING_DISK_CACHE", "1") != "0"
+_EMBEDDING_MEMORY_CACHE_MAXSIZE = 4096
+_EMBEDDING_MEMORY_CACHE: "OrderedDict[str, List[float]]" = OrderedDict()
+_EMBEDDING_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def _embedding_cache_key(text: str, dimensions: Optional[int] = None) -> str:
+    # dimensions 0 = the model's full size
+    return hashlib.sha256(f"{AZURE_OPENAI_EMBEDDING_MODEL}\0{dimensions or 0}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _get_cached_embedding(key: str) -> Optional[List[float]]:
+    with _EMBEDDING_MEMORY_CACHE_LOCK:
+        vector = _EMBEDDING_MEMORY_CACHE.get(key)
+        if vector is not None:
+            _EMBEDDING_MEMORY_CACHE.move_to_end(key)
+            return vector
+    if not EMBEDDING_DISK_CACHE_ENABLED:
+        return None
+    try:
+        with open(os.path.join(EMBEDDING_CACHE_DIR, f"{key}.json"), "rb") as f:
+            vector = _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    _remember_embedding(key, vector)
+    return vector
+
+
+def _remember_embedding(key: str, vector: List[float]) -> None:
+    with _EMBEDDING_MEMORY_CACHE_LOCK:
+        _EMBEDDING_MEMORY_CACHE[key] = vector
+        _EMBEDDING_MEMORY_CACHE.move_to_end(key)
+        while len(_EMBEDDING_MEMORY_CACHE) > _EMBEDDING_MEMORY_CACHE_MAXSIZE:
+            _EMBEDDING_MEMORY_CACHE.popitem(last=False)
+
+
+def _store_cached_embedding(key: str, vector: List[float]) -> None:
+    _remember_embedding(key, vector)
+    if not EMBEDDING_DISK_CACHE_ENABLED:
+        return
+    path = os.path.join(EMBEDDING_CACHE_DIR, f"{key}.json")
+    try:
+        os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+        # Write to a temp file and rename so concurrent workers never read a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_json_dumps(vector))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # The cache is best effort; the vector is still returned
+
+
 def embed(text: str):
     """
     Generate an embedding vector for a query using Azure OpenAI.
+    Vectors are cached by content hash (see EMBEDDING_CACHE_DIR).
     """
-    response = client.embeddings.create(
-        model=AZURE_OPENAI_EMBEDDING_MODEL,
-        input=text
-    )
-    return response.data[0].embedding
+    return embed_batch([text])[0]
+
+
+def embed_batch(texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+    """
+    Generate embedding vectors for several texts in a single Azure OpenAI request.
+    Vectors are returned in the same order as the input texts.
+    Pass dimensions to get truncated vectors (only for comparisons between
+    them, never for searching the indexes, whose vector fields are full size).
+    Vectors are cached by content hash and dimensions (in memory and under
+    EMBEDDING_CACHE_DIR), and only distinct cache misses are sent.
+    """
+    if not texts:
+        return []
+    
+    keys = [_embedding_cache_key(text, dimensions) for text in texts]
+    vectors = [_get_cached_embedding(key) for key in keys]
+    # Positions of each distinct missing text, so repeated texts are embedded once
+    missing: Dict[str, List[int]] = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        slots = list(missing.values())
+        response = client.embeddings.create(
+            model=AZURE_OPENAI_EMBEDDING_MODEL,
+            input=[texts[positions[0]] for positions in slots],
+            **({"dimensions": dimensions} if dimensions else {})
+        )
+        for d in response.data:
+            positions = slots[d.index]
+            for i in positions:
+                vectors[i] = d.embedding
+            _store_cached_embedding(keys[positions[0]], d.embedding)
+    return vectors
+
+
+# ---------------------------------------------------------
+# SEMANTIC RESULT CACHE
+# ---------------------------------------------------------
+
+class _SemanticCache:
+    """
+    Recent vector-search results keyed by query embedding.
+    
+    A query whose embedding has cosine similarity >= threshold with a cached
+    query (same k, younger than ttl seconds) reuses that query's results, so
+    paraphrased agent queries skip the search round-trip. Entries are a small
+    ring of unit vectors compared with one matrix-vector product.
+    """
+    
+    def __init__(self, maxsize: int = 256, threshold: float = 0.97, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Tuple[int, float, List[Any]]] = []  # (k, stored_at, results) per row
+        self._next = 0
+    
+    def get(self, vector: List[float], k: int) -> Optional[List[Any]]:
+        if self.threshold <= 0:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None:
+                return None
+            similarities = self._vectors[:len(self._entries)] @ query
+            for row in np.argsort(similarities)[::-1]:
+                if similarities[row] < self.threshold:
+                    break
+                entry_k, stored_at, results = self._entries[row]
+                if entry_k == k and now - stored_at <= self.ttl:
+                    return list(results)
+        return None
+    
+    def put(self, vector: List[float], k: int, results: List[Any]) -> None:
+        if self.threshold <= 0:
+            return
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.empty((self.maxsize, query.shape[0]), dtype=np.float32)
+            row = self._next
+            self._vectors[row] = query
+            entry = (k, time.monotonic(), results)
+            if row < len(self._entries):
+                self._entries[row] = entry
+            else:
+                self._entries.append(entry)
+            self._next = (row + 1) % self.maxsize
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+            self._next = 0
+
+
+# Similarity needed to reuse a cached search result; 0 disables the semantic cache
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "300"))
+
+_RUBRIC_CHUNKS_CACHE = _SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL)
+_SIMILAR_ITEMS_CACHE = _SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL)
+
+# With integrated vectorization the indexes' Azure OpenAI vectorizer embeds query
+# text server-side, so retrieval sends text instead of calling embed(). Requires
+# the vectorizer configured in the ingestion notebooks' index schemas.
+INTEGRATED_VECTORIZATION = os.getenv("AZURE_SEARCH_INTEGRATED_VECTORIZATION", "0") == "1"
+
+
+def _query_vector(query_text: str) -> Optional[List[float]]:
+    """Client-side query embedding, or None when the search service vectorizes the text."""
+    return None if INTEGRATED_VECTORIZATION else embed(query_text)
+
+
+def _content_vector_query(query_text: str, k: int, vector: Optional[List[float]]):
+    """k-NN query on content_vector; without a vector the service embeds query_text."""
+    if vector is None:
+        return VectorizableTextQuery(text=query_text, k_nearest_neighbors=k, fields="content_vector")
+    return VectorizedQuery(vector=vector, k_nearest_neighbors=k, fields="content_vector")
+
+
+def _pick_fields(result: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Copy the selected fields of a search hit, leaving out the @search.* metadata."""
+    return {field: result.get(field) for field in fields}
 
 
 # ---------------------------------------------------------
 # RUBRIC RETRIEVAL
 # ---------------------------------------------------------
 
-def retrieve_rubric_chunks(query_text: str, k: int = 8):
+def retrieve_rubric_chunks(query_text: str, k: int = 8, vector: Optional[List[float]] = None):
     """
     Retrieve the most relevant rubric chunks from the rubric index.
     NOTE: This only returns k chunks - use retrieve_all_rubric_rules() for full coverage.
+    Pass vector (embed(query_text)) to reuse an embedding already computed.
+    Near-duplicate queries are answered from _RUBRIC_CHUNKS_CACHE.
     """
-    vector = embed(query_text)
+    if vector is None:
+        vector = _query_vector(query_text)
+    if vector is not None:
+        cached = _RUBRIC_CHUNKS_CACHE.get(vector, k)
+        if cached is not None:
+            return cached
 
-    vector_query = VectorizedQuery(
-        vector=vector,
-        k_nearest_neighbors=k,
-        fields="content_vector"
-    )
+    vector_query = _content_vector_query(query_text, k, vector)
 
     results = search_rubric.search(
         search_text=None,              # or a lexical string for hybrid
@@ -120,34 +422,61 @@ def retrieve_rubric_chunks(query_text: str, k: int = 8):
         ]
     )
 
-    return [r for r in results]
+    chunks = [r for r in results]
+    if vector is not None:
+        _RUBRIC_CHUNKS_CACHE.put(vector, k, chunks)
+    return list(chunks)
 
 
 # ---------------------------------------------------------
 # FULL RUBRIC RETRIEVAL (ALL RULES)
 # ---------------------------------------------------------
 
+# Rubric rules change only when the rubric index is edited, so one fetched copy
+# is shared for RUBRIC_RULES_TTL seconds (or until invalidate_rubric_cache())
+RUBRIC_RULES_TTL = float(os.getenv("RUBRIC_RULES_TTL", "600"))
+_RUBRIC_RULES_CACHE: Optional[Tuple[float, Dict[str, List[Dict[str, Any]]]]] = None
+_RUBRIC_RULES_LOCK = threading.Lock()
+
+
+def invalidate_rubric_cache() -> None:
+    """
+    Drop every cached copy of the rubric: the rules, rubric chunk searches, and
+    comprehensive contexts (in process and on disk), so the next calls query the index.
+    """
+    global _RUBRIC_RULES_CACHE
+    with _RUBRIC_RULES_LOCK:
+        _RUBRIC_RULES_CACHE = None
+    _RUBRIC_CHUNKS_CACHE.clear()
+    _clear_context_cache()
+
+
 def retrieve_all_rubric_rules() -> Dict[str, List[Dict[str, Any]]]:
     """
     Retrieve ALL rubric rules from the index, organized by category.
     This ensures no rules are missed during item generation.
     
-    Returns a dict keyed by category with lists of rule dicts.
+    Returns a dict keyed by category with lists of rule dicts. The result is
+    cached for RUBRIC_RULES_TTL seconds and shared between callers, so it must
+    not be mutated.
     """
+    global _RUBRIC_RULES_CACHE
+    with _RUBRIC_RULES_LOCK:
+        # Held across the fetch so concurrent callers on a cold cache query only once
+        if _RUBRIC_RULES_CACHE is not None and time.monotonic() - _RUBRIC_RULES_CACHE[0] <= RUBRIC_RULES_TTL:
+            return _RUBRIC_RULES_CACHE[1]
+        rules_by_category = _fetch_all_rubric_rules()
+        _RUBRIC_RULES_CACHE = (time.monotonic(), rules_by_category)
+        return rules_by_category
+
+
+def _fetch_all_rubric_rules() -> Dict[str, List[Dict[str, Any]]]:
+    """Query every mandatory rubric rule from the index (uncached)."""
     # Query all mandatory rule categories
-    filter_expr = " or ".join([f"category eq '{cat}'" for cat in MANDATORY_RULE_CATEGORIES])
-    
     results = search_rubric.search(
         search_text="*",  # Match all
-        filter=filter_expr,
-        select=[
-            "id",
-            "category",
-            "subsection",
-            "type",
-            "content",
-            "order"
-        ],
+        filter=_MANDATORY_FILTER,
+        select=list(_RUBRIC_FIELDS),
         top=500,  # Ensure we get all rules
         order_by=["order asc"]
     )
@@ -158,42 +487,35 @@ def retrieve_all_rubric_rules() -> Dict[str, List[Dict[str, Any]]]:
         cat = r.get("category", "OTHER")
         if cat not in rules_by_category:
             rules_by_category[cat] = []
-        rules_by_category[cat].append(dict(r))
+        rules_by_category[cat].append(_pick_fields(r, _RUBRIC_FIELDS))
     
     return rules_by_category
 
 
-def retrieve_rubric_examples(query_text: str, k: int = 5) -> List[Dict[str, Any]]:
+def retrieve_rubric_examples(
+    query_text: str,
+    k: int = 5,
+    vector: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
     """
     Retrieve relevant EXAMPLE and BEFORE_AFTER chunks using semantic search.
     These are topic-specific and benefit from semantic matching.
+    Pass vector (embed(query_text)) to reuse an embedding already computed.
     """
-    vector = embed(query_text)
+    if vector is None:
+        vector = _query_vector(query_text)
     
-    vector_query = VectorizedQuery(
-        vector=vector,
-        k_nearest_neighbors=k,
-        fields="content_vector"
-    )
+    vector_query = _content_vector_query(query_text, k, vector)
     
     # Filter to only example categories
-    filter_expr = " or ".join([f"category eq '{cat}'" for cat in EXAMPLE_CATEGORIES])
-    
     results = search_rubric.search(
         search_text=None,
         vector_queries=[vector_query],
-        filter=filter_expr,
-        select=[
-            "id",
-            "category",
-            "subsection",
-            "type",
-            "content",
-            "order"
-        ]
+        filter=_EXAMPLE_FILTER,
+        select=list(_RUBRIC_FIELDS)
     )
     
-    return [dict(r) for r in results]
+    return [_pick_fields(r, _RUBRIC_FIELDS) for r in results]
 
 
 def retrieve_topic_definition(topic_code: str) -> Optional[Dict[str, Any]]:
@@ -203,19 +525,53 @@ def retrieve_topic_definition(topic_code: str) -> Optional[Dict[str, Any]]:
     results = search_rubric.search(
         search_text=None,
         filter=f"category eq 'TOPIC' and subsection eq '{topic_code}'",
-        select=["id", "category", "subsection", "type", "content"]
+        select=list(_TOPIC_FIELDS),
+        top=1  # Only the first match is used
     )
     
-    for r in results:
-        return dict(r)
-    return None
+    return next((_pick_fields(r, _TOPIC_FIELDS) for r in results), None)
+
+
+# Last (rules dict, formatted text) pair; the cached rules from retrieve_all_rubric_rules
+# are one shared object, so an identity check skips re-formatting until they refresh
+_FORMATTED_RULES: Optional[Tuple[Dict[str, List[Dict[str, Any]]], str]] = None
 
 
 def format_rules_for_prompt(rules_by_category: Dict[str, List[Dict[str, Any]]]) -> str:
     """
     Format all rubric rules into a structured prompt section.
     Organizes rules by category and type for clarity.
+    Formatting the same rules object again returns the previously built text.
     """
+    global _FORMATTED_RULES
+    cached = _FORMATTED_RULES
+    if cached is not None and cached[0] is rules_by_category:
+        return cached[1]
+    text = _format_rules(rules_by_category)
+    _FORMATTED_RULES = (rules_by_category, text)
+    return text
+
+
+# Prompt sub-sections per rule type, in output order: (heading, bullet marker)
+_RULE_BUCKET_HEADINGS = (
+    ("\nDefinitions & Principles:", "•"),
+    ("\nRequired Components:", "•"),
+    ("\nDO:", "✓"),
+    ("\nDO NOT:", "✗"),
+    ("\nNotes & Warnings:", "⚠"),
+)
+# Rule type -> index into _RULE_BUCKET_HEADINGS; other types are left out of the prompt
+_RULE_TYPE_BUCKET = {
+    "DEFINITION": 0, "PRINCIPLE": 0, "CLARIFICATION": 0,
+    "COMPONENT": 1,
+    "DO": 2, "GUIDELINE": 2, "METHOD": 2,
+    "DONT": 3,
+    "NOTE": 4, "TODO": 4, "TODO_DETAIL": 4, "ISSUE": 4,
+}
+
+
+def _format_rules(rules_by_category: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Build the rubric rules prompt section (uncached)."""
     sections = []
     
     # Define the order and formatting for each category
@@ -233,40 +589,20 @@ def format_rules_for_prompt(rules_by_category: Dict[str, List[Dict[str, Any]]])
         if cat_key not in rules_by_category:
             continue
             
-        rules = rules_by_category[cat_key]
         section_lines = [f"\n=== {cat_title} ==="]
         
-        # Group by type within category
-        dos = [r for r in rules if r.get("type") in ("DO", "GUIDELINE", "METHOD")]
-        donts = [r for r in rules if r.get("type") in ("DONT",)]
-        definitions = [r for r in rules if r.get("type") in ("DEFINITION", "PRINCIPLE", "CLARIFICATION")]
-        components = [r for r in rules if r.get("type") in ("COMPONENT",)]
-        notes = [r for r in rules if r.get("type") in ("NOTE", "TODO", "TODO_DETAIL", "ISSUE")]
+        # Group by type within category in one pass over the rules
+        buckets: Dict[int, List[str]] = {}
+        for r in rules_by_category[cat_key]:
+            bucket = _RULE_TYPE_BUCKET.get(r.get("type"))
+            if bucket is not None:
+                buckets.setdefault(bucket, []).append(r["content"])
         
-        if definitions:
-            section_lines.append("\nDefinitions & Principles:")
-            for r in definitions:
-                section_lines.append(f"  • {r['content']}")
-        
-        if components:
-            section_lines.append("\nRequired Components:")
-            for r in components:
-                section_lines.append(f"  • {r['content']}")
-        
-        if dos:
-            section_lines.append("\nDO:")
-            for r in dos:
-                section_lines.append(f"  ✓ {r['content']}")
-        
-        if donts:
-            section_lines.append("\nDO NOT:")
-            for r in donts:
-                section_lines.append(f"  ✗ {r['content']}")
-        
-        if notes:
-            section_lines.append("\nNotes & Warnings:")
-            for r in notes:
-                section_lines.append(f"  ⚠ {r['content']}")
+        for bucket, (heading, marker) in enumerate(_RULE_BUCKET_HEADINGS):
+            contents = buckets.get(bucket)
+            if contents:
+                section_lines.append(heading)
+                section_lines.extend(f"  {marker} {content}" for content in contents)
         
         sections.append("\n".join(section_lines))
     
@@ -277,17 +613,21 @@ def format_rules_for_prompt(rules_by_category: Dict[str, List[Dict[str, Any]]])
 # EXAM ITEM RETRIEVAL
 # ---------------------------------------------------------
 
-def retrieve_similar_items(query_text: str, k: int = 8):
+def retrieve_similar_items(query_text: str, k: int = 8, vector: Optional[List[float]] = None):
     """
     Retrieve similar exam items from the exam item index.
+    Pass vector (embed(query_text)) to reuse an embedding already computed.
+    Near-duplicate queries are answered from _SIMILAR_ITEMS_CACHE, which is
+    cleared whenever items are uploaded.
     """
-    vector = embed(query_text)
+    if vector is None:
+        vector = _query_vector(query_text)
+    if vector is not None:
+        cached = _SIMILAR_ITEMS_CACHE.get(vector, k)
+        if cached is not None:
+            return cached
 
-    vector_query = VectorizedQuery(
-        vector=vector,
-        k_nearest_neighbors=k,
-        fields="content_vector"
-    )
+    vector_query = _content_vector_query(query_text, k, vector)
 
     results = search_items.search(
         search_text=None,              # or a lexical string for hybrid
@@ -303,7 +643,10 @@ def retrieve_similar_items(query_text: str, k: int = 8):
         ]
     )
 
-    return [r for r in results]
+    similar = [r for r in results]
+    if vector is not None:
+        _SIMILAR_ITEMS_CACHE.put(vector, k, similar)
+    return list(similar)
 
 
 # ---------------------------------------------------------
@@ -314,9 +657,13 @@ def retrieve_dual(query_text: str, k_rubric: int = 8, k_items: int = 8):
     """
     Retrieve both rubric chunks and similar items.
     """
+    # Embed the query once, then run both searches concurrently with that vector
+    vector = _query_vector(query_text)
+    rubric = _RETRIEVAL_POOL.submit(retrieve_rubric_chunks, query_text, k=k_rubric, vector=vector)
+    items = _RETRIEVAL_POOL.submit(retrieve_similar_items, query_text, k=k_items, vector=vector)
     return {
-        "rubric": retrieve_rubric_chunks(query_text, k=k_rubric),
-        "items": retrieve_similar_items(query_text, k=k_items)
+        "rubric": rubric.result(),
+        "items": items.result()
     }
 
 
@@ -338,68 +685,214 @@ def retrieve_comprehensive_context(
     4. Topic definition
     
     Returns a structured dict with all context needed for generation.
+    The four lookups run concurrently; the query is embedded once (alongside the
+    two filter-only lookups) and shared by both vector searches.
     """
+    all_rules = _RETRIEVAL_POOL.submit(retrieve_all_rubric_rules)
+    topic_definition = _RETRIEVAL_POOL.submit(retrieve_topic_definition, topic_code)
+    vector = _query_vector(query_text)
+    relevant_examples = _RETRIEVAL_POOL.submit(retrieve_rubric_examples, query_text, k=k_examples, vector=vector)
+    similar_items = _RETRIEVAL_POOL.submit(retrieve_similar_items, query_text, k=k_items, vector=vector)
     return {
-        "all_rules": retrieve_all_rubric_rules(),
-        "topic_definition": retrieve_topic_definition(topic_code),
-        "relevant_examples": retrieve_rubric_examples(query_text, k=k_examples),
-        "similar_items": retrieve_similar_items(query_text, k=k_items),
+        "all_rules": all_rules.result(),
+        "topic_definition": topic_definition.result(),
+        "relevant_examples": relevant_examples.result(),
+        "similar_items": similar_items.result(),
     }
 
 
 # ---------------------------------------------------------
-# INDEX UPLOAD FOR SCORED ITEMS
+# COMPREHENSIVE CONTEXT CACHE
 # ---------------------------------------------------------
 
-def upload_item_to_index(item: Dict[str, Any], review_status: str = "pending_review") -> Dict[str, Any]:
+# retrieve_comprehensive_context results shared by generate_items_v2 and the agent
+# tools: an in-process map in front of one JSON file per request under
+# CONTEXT_CACHE_DIR, both expiring after CONTEXT_CACHE_TTL seconds, so repeat
+# batches and later runs skip retrieval. invalidate_rubric_cache() clears both.
+CONTEXT_CACHE_DIR = os.path.expanduser(os.getenv("CONTEXT_CACHE_DIR", "~/.cache/aspenmind/context"))
+CONTEXT_CACHE_TTL = float(os.getenv("CONTEXT_CACHE_TTL", "86400"))
+_CONTEXT_DISK_CACHE_ENABLED = True
+_CONTEXT_MEMORY_CACHE_MAXSIZE = 64
+_CONTEXT_MEMORY_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_CONTEXT_MEMORY_CACHE_LOCK = threading.Lock()
+# One lock per cache key so concurrent misses on the same request retrieve only once
+_CONTEXT_LOCKS: Dict[str, threading.Lock] = {}
+_CONTEXT_LOCKS_GUARD = threading.Lock()
+
+
+def set_context_disk_cache(enabled: bool) -> None:
+    """Enable or disable the on-disk comprehensive context cache (e.g. for --no-cache)."""
+    global _CONTEXT_DISK_CACHE_ENABLED
+    _CONTEXT_DISK_CACHE_ENABLED = enabled
+
+
+def _context_cache_key(topic_code: str, query_text: str, k_examples: int, k_items: int) -> str:
+    return hashlib.sha256(f"{topic_code}\0{query_text}\0{k_examples}\0{k_items}".encode("utf-8")).hexdigest()
+
+
+def _get_memory_context(key: str) -> Optional[Dict[str, Any]]:
+    with _CONTEXT_MEMORY_CACHE_LOCK:
+        entry = _CONTEXT_MEMORY_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > CONTEXT_CACHE_TTL:
+            del _CONTEXT_MEMORY_CACHE[key]
+            return None
+        _CONTEXT_MEMORY_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _remember_context(key: str, context: Dict[str, Any]) -> None:
+    with _CONTEXT_MEMORY_CACHE_LOCK:
+        _CONTEXT_MEMORY_CACHE[key] = (time.monotonic(), context)
+        _CONTEXT_MEMORY_CACHE.move_to_end(key)
+        while len(_CONTEXT_MEMORY_CACHE) > _CONTEXT_MEMORY_CACHE_MAXSIZE:
+            _CONTEXT_MEMORY_CACHE.popitem(last=False)
+
+
+def _load_context_from_disk(key: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(CONTEXT_CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) > CONTEXT_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None  # Missing, expired, or unreadable entries are retrieved again
+
+
+def _save_context_to_disk(key: str, context: Dict[str, Any]) -> None:
+    path = os.path.join(CONTEXT_CACHE_DIR, f"{key}.json")
+    try:
+        payload = _json_dumps(context)
+        os.makedirs(CONTEXT_CACHE_DIR, exist_ok=True)
+        # Write to a temp file and rename so concurrent runs never read a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError):
+        pass  # The cache is best effort; the context is still returned
+
+
+def get_cached_comprehensive_context(
+    topic_code: str,
+    query_text: str,
+    k_examples: int = 5,
+    k_items: int = 8
+) -> Dict[str, Any]:
     """
-    Upload a scored item to the exam items index with review/state management fields.
-    Creates embedding for the item content and includes quality + review metadata.
+    retrieve_comprehensive_context backed by the in-process and on-disk caches.
     
-    Args:
-        item: Item dictionary with content, quality, and optional generation metadata
-        review_status: Initial review status ("pending_review" | "approved" | "gold_standard")
+    The returned dict is shared between callers and must not be mutated.
+    """
+    key = _context_cache_key(topic_code, query_text, k_examples, k_items)
+    context = _get_memory_context(key)
+    if context is not None:
+        return context
     
-    Returns the upload result with success/failure status.
+    with _CONTEXT_LOCKS_GUARD:
+        key_lock = _CONTEXT_LOCKS.setdefault(key, threading.Lock())
+    
+    with key_lock:
+        # Another thread may have filled the entry while we waited for the lock
+        context = _get_memory_context(key)
+        if context is not None:
+            return context
+        context = _load_context_from_disk(key) if _CONTEXT_DISK_CACHE_ENABLED else None
+        if context is None:
+            context = retrieve_comprehensive_context(
+                topic_code=topic_code,
+                query_text=query_text,
+                k_examples=k_examples,
+                k_items=k_items
+            )
+            if _CONTEXT_DISK_CACHE_ENABLED:
+                _save_context_to_disk(key, context)
+        _remember_context(key, context)
+    return context
+
+
+def _clear_context_cache() -> None:
+    """Drop every cached comprehensive context, in process and on disk."""
+    with _CONTEXT_MEMORY_CACHE_LOCK:
+        _CONTEXT_MEMORY_CACHE.clear()
+    try:
+        names = os.listdir(CONTEXT_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".json"):
+            try:
+                os.remove(os.path.join(CONTEXT_CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+# ---------------------------------------------------------
+# INDEX UPLOAD FOR SCORED ITEMS
+# ---------------------------------------------------------
+
+def _item_content_text(item: Dict[str, Any]) -> str:
+    """Searchable text for an item, used both as full_text and as the embedding input."""
+    options = item.get("options") or {}
+    get_option = options.get
+    return "\n".join((
+        f"Topic: {item.get('topic', '')}",
+        f"Evidence: {', '.join(item.get('evidence_statements', []))}",
+        f"Stimulus: {item.get('stimulus', '')}",
+        f"Stem: {item.get('stem', '')}",
+        f"Options: A) {get_option('A', '')} B) {get_option('B', '')} C) {get_option('C', '')} D) {get_option('D', '')}",
+        f"Correct: {item.get('correct_answer', '')}",
+        f"Rationale: {item.get('rationale', '')}",
+    )).strip()
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in the index's ISO 8601 format."""
+    from datetime import datetime
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _build_item_document(
+    item: Dict[str, Any],
+    review_status: str,
+    content_text: str,
+    content_vector: List[float],
+    created_at: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the exam-items index document for a scored item.
+    
+    Batch uploads pass one created_at for every document; otherwise the
+    current time is used.
     """
     import uuid
-    from datetime import datetime
     
     # Generate unique ID if not present
     item_id = item.get("id") or str(uuid.uuid4())
     
-    # Create searchable content from item components
-    content_text = f"""
-Topic: {item.get('topic', '')}
-Evidence: {', '.join(item.get('evidence_statements', []))}
-Stimulus: {item.get('stimulus', '')}
-Stem: {item.get('stem', '')}
-Options: A) {item.get('options', {}).get('A', '')} B) {item.get('options', {}).get('B', '')} C) {item.get('options', {}).get('C', '')} D) {item.get('options', {}).get('D', '')}
-Correct: {item.get('correct_answer', '')}
-Rationale: {item.get('rationale', '')}
-""".strip()
-    
-    # Generate embedding
-    content_vector = embed(content_text)
-    
-    # Extract quality metadata
+    # Extract quality metadata and options once
     quality = item.get("quality", {})
+    options = item.get("options", {})
+    stimulus = item.get("stimulus", "")
+    stem = item.get("stem", "")
     
     # Build document for index
-    document = {
+    return {
         "id": item_id,
         "topic": item.get("topic", ""),
         "domain": item.get("domain", ""),  # Added domain field
         "evidence": ", ".join(item.get("evidence_statements", [])),
-        "question_text": f"{item.get('stimulus', '')}\n\n{item.get('stem', '')}",
+        "question_text": f"{stimulus}\n\n{stem}",
         "full_text": content_text,
-        "stimulus": item.get("stimulus", ""),
-        "stem": item.get("stem", ""),
-        "options_raw": json.dumps(item.get("options", {})),
-        "option_a": item.get("options", {}).get("A", ""),
-        "option_b": item.get("options", {}).get("B", ""),
-        "option_c": item.get("options", {}).get("C", ""),
-        "option_d": item.get("options", {}).get("D", ""),
+        "stimulus": stimulus,
+        "stem": stem,
+        "options_raw": _json_dumps(options),
+        "option_a": options.get("A", ""),
+        "option_b": options.get("B", ""),
+        "option_c": options.get("C", ""),
+        "option_d": options.get("D", ""),
         "correct_answer": item.get("correct_answer", ""),
         "rationale": item.get("rationale", ""),
         "content_vector": content_vector,
@@ -408,7 +901,7 @@ Rationale: {item.get('rationale', '')}
         "quality_score": quality.get("overall_score", 0),
         "quality_tier": quality.get("quality_tier", "unscored"),
         "quality_summary": quality.get("summary", ""),
-        "quality_scores_json": json.dumps(quality.get("scores", {})),
+        "quality_scores_json": _json_dumps(quality.get("scores", {})),
         "improvement_suggestions": quality.get("improvement_suggestions", []),
         
         # === Review & State Management (Human-in-the-Loop) ===
@@ -427,19 +920,47 @@ Rationale: {item.get('rationale', '')}
         "generation_batch_id": item.get("generation_batch_id"),
         "generation_attempt": item.get("generation_attempt", 1),
         "similarity_at_generation": item.get("similarity_at_generation"),
-        "generation_metadata_json": json.dumps(item.get("generation_metadata", {})) if item.get("generation_metadata") else None,
+        "generation_metadata_json": _json_dumps(item.get("generation_metadata", {})) if item.get("generation_metadata") else None,
         
         # === Timestamps ===
-        "created_at": datetime.utcnow().isoformat() + "Z",
+        "created_at": created_at or _utc_timestamp(),
         "scored_at": quality.get("scored_at", ""),
         
         # === Source tracking ===
         "source": item.get("source", "generated_v2"),
         "is_generated": True,
     }
+
+
+def upload_item_to_index(item: Dict[str, Any], review_status: str = "pending_review") -> Dict[str, Any]:
+    """
+    Upload a scored item to the exam items index with review/state management fields.
+    Creates embedding for the item content and includes quality + review metadata.
+    
+    Args:
+        item: Item dictionary with content, quality, and optional generation metadata
+        review_status: Initial review status ("pending_review" | "approved" | "gold_standard")
+    
+    Returns the upload result with success/failure status.
+    """
+    # Create searchable content from item components
+    content_text = _item_content_text(item)
+    
+    # Generate embedding
+    content_vector = embed(content_text)
+    
+    document = _build_item_document(item, review_status, content_text, content_vector)
+    return _upload_item_document(item, document)
+
+
+def _upload_item_document(item: Dict[str, Any], document: Dict[str, Any]) -> Dict[str, Any]:
+    """Upload one built item document and report the outcome as an upload result."""
+    item_id = document["id"]
+    quality = item.get("quality", {})
     
     try:
         result = search_items.upload_documents([document])
+        _SIMILAR_ITEMS_CACHE.clear()  # The exam index changed; cached similar items are stale
         success = result[0].succeeded
         return {
             "success": success,
@@ -456,9 +977,17 @@ Rationale: {item.get('rationale', '')}
         }
 
 
+def _is_throttled(outcome: Any) -> bool:
+    """True for a per-document indexing result rejected only because the service was busy."""
+    return outcome is not None and not outcome.succeeded and outcome.status_code in SEARCH_RETRY_POLICY["retry_on_status_codes"]
+
+
 def upload_items_batch(items: List[Dict[str, Any]], review_status: str = "pending_review") -> Dict[str, Any]:
     """
     Upload multiple scored items to the exam items index with specified review status.
+    Item texts are embedded EMBED_BATCH_SIZE per request, then the documents are
+    indexed UPLOAD_BATCH_SIZE per upload_documents call, with up to
+    UPLOAD_MAX_WORKERS calls in flight.
     
     Args:
         items: List of item dictionaries to upload
@@ -466,20 +995,69 @@ def upload_items_batch(items: List[Dict[str, Any]], review_status: str = "pendin
     
     Returns summary of upload results.
     """
-    results = []
-    for item in items:
-        result = upload_item_to_index(item, review_status=review_status)
-        results.append(result)
+    content_texts = [_item_content_text(item) for item in items]
+    content_vectors: List[Optional[List[float]]] = [None] * len(items)
+    embed_errors: Dict[int, str] = {}
+    for start in range(0, len(items), EMBED_BATCH_SIZE):
+        end = start + EMBED_BATCH_SIZE
+        try:
+            content_vectors[start:end] = embed_batch(content_texts[start:end])
+        except Exception as e:
+            # Only this chunk's items fail; the rest of the batch still uploads
+            embed_errors.update((i, str(e)) for i in range(start, min(end, len(items))))
     
-    succeeded = sum(1 for r in results if r["success"])
-    failed = len(results) - succeeded
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    indexable = []
+    created_at = _utc_timestamp()
+    for i, item in enumerate(items):
+        if i in embed_errors:
+            results[i] = {"success": False, "id": item.get("id", "unknown"), "error": embed_errors[i]}
+        else:
+            indexable.append((i, _build_item_document(item, review_status, content_texts[i], content_vectors[i], created_at)))
     
-    # Group by quality tier
-    tier_counts = {}
-    for r in results:
-        if r["success"]:
-            tier = r.get("quality_tier", "unscored")
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+    def _push(chunk: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # One indexing request for the whole chunk; outcomes come back per document key.
+        # Throttled requests are retried by the client's retry policy, but documents
+        # throttled inside a partial (207) response are resubmitted here with backoff.
+        outcomes: Dict[str, Any] = {}
+        error = "no indexing result returned"
+        pending = [doc for _, doc in chunk]
+        for attempt in range(UPLOAD_DOCUMENT_RETRIES + 1):
+            if attempt:
+                time.sleep(SEARCH_RETRY_POLICY["retry_backoff_factor"] * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+            try:
+                outcomes.update((r.key, r) for r in search_items.upload_documents(pending))
+            except Exception as e:
+                error = str(e)
+                break
+            pending = [doc for doc in pending if _is_throttled(outcomes.get(doc["id"]))]
+            if not pending:
+                break
+        for i, doc in chunk:
+            quality = items[i].get("quality", {})
+            outcome = outcomes.get(doc["id"])
+            success = outcome is not None and outcome.succeeded
+            results[i] = {
+                "success": success,
+                "id": doc["id"],
+                "quality_tier": quality.get("quality_tier", "unscored"),
+                "quality_score": quality.get("overall_score", 0),
+                "error": None if success else (outcome.error_message if outcome is not None else error),
+            }
+    
+    chunks = [indexable[start:start + UPLOAD_BATCH_SIZE] for start in range(0, len(indexable), UPLOAD_BATCH_SIZE)]
+    if chunks:
+        # Chunks go out concurrently over the pooled client so round-trips overlap
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_MAX_WORKERS, len(chunks))) as pool:
+            list(pool.map(_push, chunks))
+        _SIMILAR_ITEMS_CACHE.clear()  # The exam index changed; cached similar items are stale
+    
+    failures = [r for r in results if not r["success"]]
+    failed = len(failures)
+    succeeded = len(results) - failed
+    
+    # Group successful uploads by the quality tier already assigned at scoring time
+    tier_counts = dict(Counter(r.get("quality_tier", "unscored") for r in results if r["success"]))
     
     return {
         "total": len(items),
@@ -487,6 +1065,7 @@ def upload_items_batch(items: List[Dict[str, Any]], review_status: str = "pendin
         "failed": failed,
         "by_tier": tier_counts,
         "results": results,
+        "failures": failures,
     }
 
 
@@ -494,6 +1073,13 @@ def upload_items_batch(items: List[Dict[str, Any]], review_status: str = "pendin
 # QUALITY-AWARE RETRIEVAL
 # ---------------------------------------------------------
 
+_QUALITY_ITEM_FIELDS = (
+    "id", "topic", "evidence", "question_text", "stimulus", "stem",
+    "options_raw", "correct_answer", "rationale",
+    "quality_score", "quality_tier", "quality_summary",
+)
+
+
 def retrieve_items_by_quality(
     query_text: str,
     min_score: float = 0.0,
@@ -537,24 +1123,11 @@ def retrieve_items_by_quality(
         search_text=None,
         vector_queries=[vector_query],
         filter=filter_expr,
-        select=[
-            "id",
-            "topic",
-            "evidence",
-            "question_text",
-            "stimulus",
-            "stem",
-            "options_raw",
-            "correct_answer",
-            "rationale",
-            "quality_score",
-            "quality_tier",
-            "quality_summary",
-        ],
+        select=list(_QUALITY_ITEM_FIELDS),
         top=k
     )
     
-    return [dict(r) for r in results]
+    return [_pick_fields(r, _QUALITY_ITEM_FIELDS) for r in results]
 
 
 def retrieve_gold_and_low_quality_items(
@@ -594,6 +1167,35 @@ def retrieve_gold_and_low_quality_items(
 # REVIEW & STATE MANAGEMENT (for Agent Framework)
 # ---------------------------------------------------------
 
+_OPTION_FIELDS = frozenset({"option_a", "option_b", "option_c", "option_d"})
+# Index fields that feed _item_content_text (and so the stored content_vector)
+_CONTENT_TEXT_FIELDS = frozenset({
+    "topic", "evidence", "stimulus", "stem", "options_raw",
+    "option_a", "option_b", "option_c", "option_d", "correct_answer", "rationale",
+})
+
+
+def _item_from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the item fields used by _item_content_text from an exam-index document."""
+    options_raw = document.get("options_raw")
+    try:
+        options = _json_loads(options_raw) if options_raw else None
+    except ValueError:
+        options = None
+    if not isinstance(options, dict):
+        options = {letter: document.get(f"option_{letter.lower()}") or "" for letter in "ABCD"}
+    evidence = document.get("evidence")
+    return {
+        "topic": document.get("topic") or "",
+        "evidence_statements": [evidence] if evidence else [],
+        "stimulus": document.get("stimulus") or "",
+        "stem": document.get("stem") or "",
+        "options": options,
+        "correct_answer": document.get("correct_answer") or "",
+        "rationale": document.get("rationale") or "",
+    }
+
+
 def update_review_status(
     item_id: str,
     review_decision: str,
@@ -635,6 +1237,8 @@ def update_review_status(
             "error": f"Invalid review_decision: {review_decision}. Must be 'upvote' or 'downvote'."
         }
     
+    embed_warning = None
+    
     # Build update document
     update_doc = {
         "id": item_id,
@@ -650,23 +1254,38 @@ def update_review_status(
         # Capture original version before edits (JSON snapshot)
         original_snapshot = {k: current_item.get(k) for k in edited_fields.keys()}
         update_doc["was_edited"] = True
-        update_doc["original_version_json"] = json.dumps(original_snapshot)
+        update_doc["original_version_json"] = _json_dumps(original_snapshot)
         update_doc["edit_summary"] = f"Edited fields: {', '.join(edited_fields.keys())}"
         
         # Merge edited fields into update
         update_doc.update(edited_fields)
+        
+        # Re-embed only when the edit changed text the content vector was built from;
+        # metadata-only edits keep the stored vector
+        if edited_fields.keys() & _CONTENT_TEXT_FIELDS:
+            edited_document = {**current_item, **edited_fields}
+            if "options_raw" not in edited_fields and edited_fields.keys() & _OPTION_FIELDS:
+                edited_document["options_raw"] = None  # Per-option edits win over the stale JSON
+            content_text = _item_content_text(_item_from_document(edited_document))
+            try:
+                update_doc["content_vector"] = embed(content_text)
+                update_doc["full_text"] = content_text
+            except Exception as e:
+                embed_warning = f"Content vector not refreshed: {e}"
     else:
         update_doc["was_edited"] = False
     
     # Perform merge_or_upload (updates existing document)
     try:
         result = search_items.merge_or_upload_documents([update_doc])
+        _SIMILAR_ITEMS_CACHE.clear()  # Edited fields may appear in cached similar items
         success = result[0].succeeded
         return {
             "success": success,
             "item_id": item_id,
             "new_status": review_status,
             "error": None if success else result[0].error_message,
+            "warning": embed_warning,
         }
     except Exception as e:
         return {
@@ -676,6 +1295,32 @@ def update_review_status(
         }
 
 
+# Fields selected by the review queue queries
+_PENDING_FIELDS = (
+    "id", "topic", "evidence", "stimulus", "stem",
+    "option_a", "option_b", "option_c", "option_d",
+    "correct_answer", "rationale",
+    "quality_score", "quality_tier", "quality_summary",
+    "generation_batch_id", "generation_attempt", "similarity_at_generation",
+    "created_at",
+)
+_APPROVED_FIELDS = (
+    "id", "topic", "evidence", "stimulus", "stem",
+    "option_a", "option_b", "option_c", "option_d",
+    "correct_answer", "rationale",
+    "quality_score", "quality_tier",
+    "was_edited", "edit_summary",
+    "reviewed_at", "reviewed_by",
+)
+_REJECTED_FIELDS = (
+    "id", "topic", "evidence", "stimulus", "stem",
+    "quality_score", "quality_tier", "quality_summary",
+    "review_decision", "review_explanation",
+    "generation_batch_id", "similarity_at_generation",
+    "reviewed_at", "reviewed_by",
+)
+
+
 def get_pending_review_items(limit: int = 50) -> List[Dict[str, Any]]:
     """
     Retrieve all items pending human review.
@@ -688,19 +1333,12 @@ def get_pending_review_items(limit: int = 50) -> List[Dict[str, Any]]:
     results = search_items.search(
         search_text="*",
         filter="review_status eq 'pending_review'",
-        select=[
-            "id", "topic", "evidence", "stimulus", "stem",
-            "option_a", "option_b", "option_c", "option_d",
-            "correct_answer", "rationale",
-            "quality_score", "quality_tier", "quality_summary",
-            "generation_batch_id", "generation_attempt", "similarity_at_generation",
-            "created_at"
-        ],
+        select=list(_PENDING_FIELDS),
         order_by=["created_at desc"],
         top=limit
     )
     
-    return [dict(r) for r in results]
+    return [_pick_fields(r, _PENDING_FIELDS) for r in results]
 
 
 def get_approved_items(
@@ -724,19 +1362,12 @@ def get_approved_items(
     results = search_items.search(
         search_text="*",
         filter=filter_expr,
-        select=[
-            "id", "topic", "evidence", "stimulus", "stem",
-            "option_a", "option_b", "option_c", "option_d",
-            "correct_answer", "rationale",
-            "quality_score", "quality_tier",
-            "was_edited", "edit_summary",
-            "reviewed_at", "reviewed_by"
-        ],
+        select=list(_APPROVED_FIELDS),
         order_by=["reviewed_at desc"],
         top=limit
     )
     
-    return [dict(r) for r in results]
+    return [_pick_fields(r, _APPROVED_FIELDS) for r in results]
 
 
 def get_rejection_patterns(topic: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
@@ -757,30 +1388,39 @@ def get_rejection_patterns(topic: Optional[str] = None, limit: int = 50) -> List
     results = search_items.search(
         search_text="*",
         filter=filter_expr,
-        select=[
-            "id", "topic", "evidence", "stimulus", "stem",
-            "quality_score", "quality_tier", "quality_summary",
-            "review_decision", "review_explanation",
-            "generation_batch_id", "similarity_at_generation",
-            "reviewed_at", "reviewed_by"
-        ],
+        select=list(_REJECTED_FIELDS),
         order_by=["reviewed_at desc"],
         top=limit
     )
     
-    return [dict(r) for r in results]
+    return [_pick_fields(r, _REJECTED_FIELDS) for r in results]
 
 
-def get_review_analytics() -> Dict[str, Any]:
+_REVIEW_STATUSES = ["pending_review", "approved", "approved_with_edits", "rejected", "gold_standard"]
+
+
+def _review_status_counts() -> Dict[str, int]:
     """
-    Get summary analytics on review workflow status.
-    Useful for monitoring review progress and quality trends.
+    Item counts per review status from one faceted query.
     
-    Returns dict with counts by review_status, quality metrics, and edit rates
+    Falls back to one count-only query per status if the index rejects the facet
+    (e.g. review_status is not facetable).
     """
-    # Get counts by review status
+    try:
+        results = search_items.search(
+            search_text="*",
+            facets=[f"review_status,count:{len(_REVIEW_STATUSES) * 2}"],
+            select=["id"],
+            top=0  # Only need facet counts
+        )
+        facets = results.get_facets() or {}
+        counts = {facet["value"]: facet["count"] for facet in facets.get("review_status", [])}
+        return {status: counts.get(status, 0) for status in _REVIEW_STATUSES}
+    except HttpResponseError:
+        pass
+    
     status_counts = {}
-    for status in ["pending_review", "approved", "approved_with_edits", "rejected", "gold_standard"]:
+    for status in _REVIEW_STATUSES:
         results = search_items.search(
             search_text="*",
             filter=f"review_status eq '{status}'",
@@ -789,22 +1429,43 @@ def get_review_analytics() -> Dict[str, Any]:
             include_total_count=True
         )
         status_counts[status] = results.get_count()
+    return status_counts
+
+
+def _average_quality_score(status: str) -> float:
+    """Mean quality_score over up to 1000 items with the given review status."""
+    results = search_items.search(
+        search_text="*",
+        filter=f"review_status eq '{status}'",
+        select=["quality_score"],
+        top=1000  # Sample size
+    )
+    scores = [r.get("quality_score", 0) for r in results if r.get("quality_score")]
+    return sum(scores) / len(scores) if scores else 0
+
+
+def get_review_analytics() -> Dict[str, Any]:
+    """
+    Get summary analytics on review workflow status.
+    Useful for monitoring review progress and quality trends.
+    
+    Returns dict with counts by review_status, quality metrics, and edit rates
+    """
+    # Average quality queries are independent of the counts; start them first
+    quality_futures = {
+        status: _RETRIEVAL_POOL.submit(_average_quality_score, status)
+        for status in ["approved", "approved_with_edits", "rejected"]
+    }
+    
+    # Get counts by review status
+    status_counts = _review_status_counts()
     
     # Get edit rate (approved_with_edits / total approved)
     total_approved = status_counts["approved"] + status_counts["approved_with_edits"]
     edit_rate = (status_counts["approved_with_edits"] / total_approved * 100) if total_approved > 0 else 0
     
     # Get average quality score by review status
-    quality_by_status = {}
-    for status in ["approved", "approved_with_edits", "rejected"]:
-        results = search_items.search(
-            search_text="*",
-            filter=f"review_status eq '{status}'",
-            select=["quality_score"],
-            top=1000  # Sample size
-        )
-        scores = [r.get("quality_score", 0) for r in results if r.get("quality_score")]
-        quality_by_status[status] = sum(scores) / len(scores) if scores else 0
+    quality_by_status = {status: future.result() for status, future in quality_futures.items()}
     
     return {
         "status_counts": status_counts,
@@ -814,7 +1475,3 @@ def get_review_analytics() -> Dict[str, Any]:
         "edit_rate": edit_rate,
         "avg_quality_by_status": quality_by_status,
     }
-
-
-# Need json import for upload functions
-import json
\ No newline at end of file